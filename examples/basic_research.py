@@ -6,21 +6,35 @@ WebWeaver 基础研究示例
 
 import sys
 import os
+import functools
 import yaml
 import json
 from datetime import datetime
 
+try:
+    # C实现的YAML加载器，比纯Python的SafeLoader快5-10倍
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+try:
+    # 可选依赖：orjson的C编码器序列化大结果时比标准库json快一个量级
+    import orjson
+except ImportError:
+    orjson = None
+
 # 添加src目录到Python路径
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from core.webweaver import WebWeaver
 from tools.search_engine import MockSearchEngine
 
+@functools.lru_cache(maxsize=1)
 def load_config():
-    """加载配置文件"""
+    """加载配置文件（进程内只解析一次）"""
     config_path = os.path.join(os.path.dirname(__file__), '..', 'config', 'default.yaml')
     with open(config_path, 'r', encoding='utf-8') as f:
-        return yaml.safe_load(f)
+        return yaml.load(f, Loader=_YamlLoader)
 
 def setup_mock_search_engine(config):
     """设置模拟搜索引擎"""
@@ -114,8 +128,12 @@ def main():
         
         # 保存结果到文件
         output_file = f"research_result_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(result.to_dict(), f, ensure_ascii=False, indent=2)
+        if orjson is not None:
+            with open(output_file, 'wb') as f:
+                f.write(orjson.dumps(result.to_dict(), option=orjson.OPT_INDENT_2))
+        else:
+            with open(output_file, 'w', encoding='utf-8') as f:
+                json.dump(result.to_dict(), f, ensure_ascii=False, indent=2)
         
         print(f"\n结果已保存到: {output_file}")
         
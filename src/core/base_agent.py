@@ -7,10 +7,25 @@
 from abc import ABC, abstractmethod
 from typing import Dict, Any, List, Optional
 from dataclasses import dataclass, field
+import asyncio
+import hashlib
 import json
+import logging
+import os
+import re
 import time
+import zlib
 from datetime import datetime
 
+import numpy as np
+
+# 智能体在拼接提示词时用该分隔符标记"稳定前缀/动态后缀"的边界，
+# 稳定前缀（系统指令+大纲等共享上下文）可以命中服务端的KV缓存
+PROMPT_PREFIX_DELIMITER = "\n###SECTION###\n"
+
+# CJK连续段：语义缓存嵌入时按字符二元组切分（同MemoryBank._tokenize）
+_CJK_RE = re.compile(r'[一-鿿]+')
+
 @dataclass
 class AgentState:
     """智能体状态"""
@@ -18,13 +33,113 @@ class AgentState:
     iteration_count: int = 0
     context: Dict[str, Any] = field(default_factory=dict)
     memory: List[Dict[str, Any]] = field(default_factory=list)
-    start_time: Optional[datetime] = None
-    last_update: Optional[datetime] = None
-    
+    # 单调时钟纳秒数：高频更新路径上比datetime.now()+isoformat便宜得多
+    start_time: Optional[int] = None
+    last_update: Optional[int] = None
+
     def __post_init__(self):
+        now = time.monotonic_ns()
         if self.start_time is None:
-            self.start_time = datetime.now()
-        self.last_update = datetime.now()
+            self.start_time = now
+        self.last_update = now
+
+class SemanticCache:
+    """语义缓存
+
+    按提示词向量的余弦相似度复用LLM响应：命中时省掉一次LLM往返。
+    向量使用hashing trick的词袋嵌入（纯numpy实现，无需额外的
+    embedding模型依赖），查找是对所有已缓存向量的一次矩阵点积。
+    """
+
+    def __init__(self, threshold: float = 0.95, max_entries: int = 1024, dims: int = 256):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.dims = dims
+        self._vectors: List[np.ndarray] = []
+        self._responses: List[str] = []
+
+    def embed(self, prompt: str) -> np.ndarray:
+        """将提示词的动态后缀嵌入为归一化的词袋向量
+
+        只嵌入分隔符之后的动态部分：写作调用共享同一段很长的
+        静态前导，连前导一起嵌入会让任意两个提示词的相似度被
+        公共词汇抬高，互不相关的章节也能越过命中阈值，错拿到
+        别的章节的缓存响应。
+
+        分桶用crc32而不是内建hash：后者每个进程用随机盐
+        （PYTHONHASHSEED），同一提示词跨进程嵌出不同向量，
+        save/load持久化的向量就没法和新进程的查询比相似度了。
+        """
+        _, sep, suffix = prompt.partition(PROMPT_PREFIX_DELIMITER)
+        if sep:
+            prompt = suffix
+        vector = np.zeros(self.dims, dtype=np.float32)
+        for token in self._tokenize(prompt):
+            vector[zlib.crc32(token.encode('utf-8')) % self.dims] += 1.0
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector
+
+    @staticmethod
+    def _tokenize(text: str) -> List[str]:
+        """空格分词，CJK连续段补充字符二元组
+
+        与MemoryBank._tokenize同策略：中文没有空格分词，
+        只靠split()整行会缩成单个token，向量剩不下多少区分度。
+        """
+        text = text.lower()
+        tokens = text.split()
+        for run in _CJK_RE.findall(text):
+            if len(run) == 1:
+                tokens.append(run)
+            else:
+                tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        return tokens
+
+    def search(self, vector: np.ndarray) -> Optional[str]:
+        """查找余弦相似度超过阈值的缓存响应"""
+        if not self._vectors:
+            return None
+        similarities = np.stack(self._vectors) @ vector
+        best = int(np.argmax(similarities))
+        if similarities[best] >= self.threshold:
+            return self._responses[best]
+        return None
+
+    def add(self, vector: np.ndarray, response: str):
+        """缓存一条响应"""
+        if len(self._vectors) >= self.max_entries:
+            # 淘汰最旧的条目
+            self._vectors.pop(0)
+            self._responses.pop(0)
+        self._vectors.append(vector)
+        self._responses.append(response)
+
+    def save(self, path: str):
+        """持久化到磁盘（.npy向量 + .jsonl响应）"""
+        if self._vectors:
+            np.save(path + ".npy", np.stack(self._vectors))
+        with open(path + ".jsonl", 'w', encoding='utf-8') as f:
+            for response in self._responses:
+                f.write(json.dumps({"response": response}, ensure_ascii=False) + "\n")
+
+    def load(self, path: str):
+        """从磁盘加载缓存"""
+        if not os.path.exists(path + ".jsonl"):
+            return
+        with open(path + ".jsonl", 'r', encoding='utf-8') as f:
+            self._responses = [json.loads(line)["response"] for line in f if line.strip()]
+        if os.path.exists(path + ".npy") and self._responses:
+            self._vectors = list(np.load(path + ".npy"))
+        else:
+            self._vectors = []
+            self._responses = []
+
+    def clear(self):
+        """清空缓存"""
+        self._vectors.clear()
+        self._responses.clear()
 
 class BaseAgent(ABC):
     """基础智能体抽象类"""
@@ -34,6 +149,11 @@ class BaseAgent(ABC):
         self.config = config
         self.state = AgentState()
         self.logger = self._setup_logger()
+        self._semantic_cache = SemanticCache(
+            threshold=config.get("semantic_cache_threshold", 0.95)
+        )
+        # 前缀哈希 -> 会话内的提示词前缀缓存记录
+        self._prefix_cache: Dict[str, Dict[str, Any]] = {}
     
     @abstractmethod
     def process(self, input_data: Any) -> Any:
@@ -51,16 +171,18 @@ class BaseAgent(ABC):
             if hasattr(self.state, key):
                 setattr(self.state, key, value)
         
-        self.state.last_update = datetime.now()
-        self.logger.info(f"Agent {self.name} state updated: {kwargs}")
-    
+        self.state.last_update = time.monotonic_ns()
+        self.logger.info("Agent %s state updated: %s", self.name, kwargs)
+
     def add_to_memory(self, item: Dict[str, Any]):
         """添加项目到记忆"""
         self.state.memory.append({
-            "timestamp": datetime.now().isoformat(),
+            "t_ns": time.monotonic_ns(),
             "item": item
         })
-        self.logger.debug(f"Added item to memory: {item}")
+        # 高频路径：只有DEBUG级别开启时才付字符串化item的成本
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Added item to memory: %s", item)
     
     def get_memory(self, filter_func: Optional[callable] = None) -> List[Dict[str, Any]]:
         """获取记忆"""
@@ -72,22 +194,22 @@ class BaseAgent(ABC):
     def clear_memory(self):
         """清空记忆"""
         self.state.memory.clear()
-        self.logger.info(f"Cleared memory for agent {self.name}")
+        self.logger.info("Cleared memory for agent %s", self.name)
     
     def get_elapsed_time(self) -> float:
         """获取已用时间（秒）"""
         if self.state.start_time is None:
             return 0.0
-        return (datetime.now() - self.state.start_time).total_seconds()
+        return (time.monotonic_ns() - self.state.start_time) / 1e9
     
     def reset(self):
         """重置智能体状态"""
         self.state = AgentState()
-        self.logger.info(f"Reset agent {self.name}")
+        self._prefix_cache.clear()
+        self.logger.info("Reset agent %s", self.name)
     
     def _setup_logger(self):
         """设置日志记录器"""
-        import logging
         logger = logging.getLogger(f"webweaver.{self.name}")
         if not logger.handlers:
             handler = logging.StreamHandler()
@@ -101,20 +223,87 @@ class BaseAgent(ABC):
     
     def _call_llm(self, prompt: str, **kwargs) -> str:
         """调用大语言模型"""
+        # 语义缓存：近似重复的提示词直接复用已有响应
+        vector = self._semantic_cache.embed(prompt)
+        cached = self._semantic_cache.search(vector)
+        if cached is not None:
+            self.logger.debug("Semantic cache hit for LLM call")
+            return cached
+
+        # 登记共享前缀，使同一会话内的后续调用能复用服务端KV缓存
+        self._register_prompt_prefix(prompt)
+
         # 这里应该实现具体的LLM调用逻辑
         # 为了演示，我们返回一个占位符
-        self.logger.info(f"Calling LLM with prompt length: {len(prompt)}")
-        
+        self.logger.info("Calling LLM with prompt length: %d", len(prompt))
+
         # 实际实现中，这里应该调用具体的LLM API
         # 例如 OpenAI, Anthropic, 或其他LLM服务
-        return "LLM response placeholder"
+        response = "LLM response placeholder"
+        self._semantic_cache.add(vector, response)
+        return response
+
+    @staticmethod
+    def _split_prompt_prefix(prompt: str) -> tuple:
+        """按分隔符将提示词拆分为(稳定前缀, 动态后缀)"""
+        prefix, sep, suffix = prompt.partition(PROMPT_PREFIX_DELIMITER)
+        if not sep:
+            return "", prompt
+        return prefix, suffix
+
+    def _register_prompt_prefix(self, prompt: str) -> Optional[str]:
+        """登记提示词的稳定前缀，返回前缀哈希
+
+        首次出现的前缀需要注册到提供商的提示词缓存
+        （如 Anthropic 的 cache_control ephemeral 块），
+        之后共享该前缀的调用只为动态后缀付prefill成本。
+        """
+        prefix, _ = self._split_prompt_prefix(prompt)
+        if not prefix:
+            return None
+
+        prefix_hash = hashlib.blake2b(prefix.encode('utf-8'), digest_size=8).hexdigest()
+        entry = self._prefix_cache.get(prefix_hash)
+        if entry is None:
+            # 实际实现中在这里向提供商注册前缀缓存块
+            self._prefix_cache[prefix_hash] = {"hits": 0, "prefix_length": len(prefix)}
+            self.logger.debug("Registered prompt prefix %s (%d chars)", prefix_hash, len(prefix))
+        else:
+            entry["hits"] += 1
+        return prefix_hash
+
+    async def _call_llm_async(self, prompt: str, **kwargs) -> str:
+        """异步调用大语言模型"""
+        # 实际实现中应使用异步客户端（如 openai.AsyncOpenAI 或
+        # anthropic.AsyncClient），让多个调用在网络RTT上重叠
+        return self._call_llm(prompt, **kwargs)
+
+    async def _call_llm_many(self, prompts: List[str], **kwargs) -> List[str]:
+        """并发批量调用大语言模型
+
+        通过信号量限制并发数（config中的llm_concurrency，默认16），
+        避免触发服务端限流。
+        """
+        semaphore = asyncio.Semaphore(self.config.get("llm_concurrency", 16))
+
+        async def call_one(prompt: str) -> str:
+            async with semaphore:
+                return await self._call_llm_async(prompt, **kwargs)
+
+        return list(await asyncio.gather(*(call_one(p) for p in prompts)))
+
+    def _call_llm_batch(self, prompts: List[str], **kwargs) -> List[str]:
+        """批量调用大语言模型（同步入口）"""
+        if not prompts:
+            return []
+        return asyncio.run(self._call_llm_many(prompts, **kwargs))
     
     def _parse_json_response(self, response: str) -> Dict[str, Any]:
         """解析JSON响应"""
         try:
             return json.loads(response)
         except json.JSONDecodeError as e:
-            self.logger.error(f"Failed to parse JSON response: {e}")
+            self.logger.error("Failed to parse JSON response: %s", e)
             return {}
     
     def to_dict(self) -> Dict[str, Any]:
@@ -7,13 +7,129 @@
 from typing import List, Dict, Any, Optional, Set
 from dataclasses import dataclass, field
 import hashlib
+import heapq
 import json
+import os
+import re
 import time
-from collections import defaultdict
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 import logging
 
-@dataclass
+import numpy as np
+
+try:
+    # 可选依赖：blake3提供AVX2/AVX-512加速的哈希实现
+    import blake3
+except ImportError:
+    blake3 = None
+
+try:
+    # 可选依赖：numba把批量Jaccard内核编译为并行的机器码
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+try:
+    # 可选依赖：xxhash的shingle哈希吞吐量远高于加密哈希
+    import xxhash
+
+    def _shingle_hash(shingle: str) -> int:
+        return xxhash.xxh64(shingle.encode('utf-8')).intdigest()
+except ImportError:
+    _shingle_hash = hash
+
+# 字符shingle长度：CJK信息密度高用短shingle，拉丁文本用长shingle
+_CJK_SHINGLE_K = 4
+_LATIN_SHINGLE_K = 8
+
+# 字节popcount查找表，供无numba时的numpy批量内核使用
+_POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint16)
+
+
+def _jaccard_bulk_numpy(query: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """对查询位图与候选位图矩阵逐行计算Jaccard（numpy实现）
+
+    参数为uint8字节视图：query形状(W,)，matrix形状(N, W)。
+    """
+    inter = _POPCOUNT_TABLE[query & matrix].sum(axis=1)
+    union = _POPCOUNT_TABLE[query | matrix].sum(axis=1)
+    scores = np.zeros(len(matrix), dtype=np.float32)
+    nonzero = union > 0
+    scores[nonzero] = inter[nonzero] / union[nonzero]
+    return scores
+
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _jaccard_bulk_jit(query, matrix):  # pragma: no cover - 需要numba
+        n = matrix.shape[0]
+        width = matrix.shape[1]
+        scores = np.zeros(n, dtype=np.float32)
+        for i in prange(n):
+            inter = 0
+            union = 0
+            for j in range(width):
+                a = query[j] & matrix[i, j]
+                b = query[j] | matrix[i, j]
+                while a:
+                    a &= a - 1
+                    inter += 1
+                while b:
+                    b &= b - 1
+                    union += 1
+            if union > 0:
+                scores[i] = inter / union
+        return scores
+
+    _jaccard_bulk = _jaccard_bulk_jit
+else:
+    _jaccard_bulk = _jaccard_bulk_numpy
+
+
+def _pack_bitsets(query: int, candidates: List[int]) -> tuple:
+    """把Python int位图打包成定宽的uint8字节矩阵"""
+    width = max(query.bit_length(), max(c.bit_length() for c in candidates))
+    width = (width + 7) // 8 or 1
+    query_row = np.frombuffer(query.to_bytes(width, 'little'), dtype=np.uint8)
+    matrix = np.frombuffer(
+        b''.join(c.to_bytes(width, 'little') for c in candidates), dtype=np.uint8
+    ).reshape(len(candidates), width)
+    return query_row, matrix
+
+
+def _content_digest(data: bytes) -> str:
+    """计算内容摘要（16个十六进制字符）"""
+    if blake3 is not None:
+        return blake3.blake3(data).hexdigest(length=8)
+    # blake2b是标准库中最快的哈希之一，明显快于MD5
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+# 分词用的预编译正则和停用词表
+# 模块级常量避免每次调用时重建
+_PUNCT_RE = re.compile(r'[^\w\s]')
+_CJK_RE = re.compile(r'[一-鿿]+')
+_STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'have',
+    'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should'
+})
+
+# MinHash/LSH 参数
+# 128个哈希函数，分为32个band（每个band 4行），
+# 对应的相似度阈值约为 (1/32)^(1/4) ≈ 0.42，低于默认的0.7，
+# 因此LSH桶只会漏掉明显不相似的候选，不会漏掉真正的重复。
+_MINHASH_PERMS = 128
+_LSH_BANDS = 32
+_LSH_ROWS = 4
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_HASH_MASK = np.uint64((1 << 61) - 1)
+
+# popcount：C实现的int.bit_count（包的下限是3.10，正好可用）
+_popcount = int.bit_count
+
+@dataclass(slots=True)
 class Evidence:
     """证据类"""
     id: str = ""
@@ -23,7 +139,8 @@ class Evidence:
     url: str = ""
     relevance_score: float = 0.0
     metadata: Dict[str, Any] = field(default_factory=dict)
-    timestamp: datetime = field(default_factory=datetime.now)
+    # 纳秒级整数时间戳：比datetime对象创建/比较都便宜，序列化时才格式化
+    timestamp: int = field(default_factory=time.time_ns)
     
     def __post_init__(self):
         if not self.id:
@@ -33,10 +150,14 @@ class Evidence:
     
     def _generate_id(self) -> str:
         """生成唯一ID"""
-        content_hash = hashlib.md5(self.content.encode('utf-8')).hexdigest()
-        timestamp = str(int(time.time()))
-        return f"evidence_{content_hash[:8]}_{timestamp[-6:]}"
+        # 纯内容哈希：同一内容跨会话生成相同ID，便于跨会话去重
+        return f"evidence_{_content_digest(self.content.encode('utf-8'))}"
     
+    @property
+    def iso_timestamp(self) -> str:
+        """ISO格式的时间戳（仅在序列化等需要时计算）"""
+        return datetime.fromtimestamp(self.timestamp / 1e9).isoformat()
+
     def _generate_summary(self) -> str:
         """生成内容摘要"""
         if len(self.content) <= 200:
@@ -53,12 +174,19 @@ class Evidence:
             "url": self.url,
             "relevance_score": self.relevance_score,
             "metadata": self.metadata,
-            "timestamp": self.timestamp.isoformat()
+            "timestamp": self.iso_timestamp
         }
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Evidence':
         """从字典创建实例"""
+        timestamp = data.get("timestamp")
+        if isinstance(timestamp, str):
+            # 兼容ISO格式的旧导出
+            timestamp = int(datetime.fromisoformat(timestamp).timestamp() * 1e9)
+        elif timestamp is None:
+            timestamp = time.time_ns()
+
         return cls(
             id=data.get("id", ""),
             content=data.get("content", ""),
@@ -67,9 +195,92 @@ class Evidence:
             url=data.get("url", ""),
             relevance_score=data.get("relevance_score", 0.0),
             metadata=data.get("metadata", {}),
-            timestamp=datetime.fromisoformat(data.get("timestamp", datetime.now().isoformat()))
+            timestamp=timestamp
         )
 
+def evidence_lines(evidence: List['Evidence'], limit: int = 500) -> List[str]:
+    """把证据列表格式化为提示词用的编号文本行
+
+    写作和评估提示词都需要这种"证据 N (ID: ...)"的列表，
+    集中在Evidence旁边实现，截断长度由调用方按提示词预算指定。
+    """
+    return [
+        f"证据 {i} (ID: {ev.id}):\n{ev.content[:limit]}..."
+        for i, ev in enumerate(evidence, 1)
+    ]
+
+# 导入条目超过该数量时用进程池并行重建Evidence
+_PARALLEL_IMPORT_THRESHOLD = 2000
+
+
+def _rehydrate_chunk(items: List[Dict[str, Any]]) -> List['Evidence']:
+    """批量重建Evidence（在子进程中执行）"""
+    return [Evidence.from_dict(ev_data) for ev_data in items]
+
+# 证据行的字段描述：在类构造时编译为numpy结构化dtype
+_ROW_FIELDS = [
+    ('relevance', np.float32),
+    ('timestamp_ns', np.int64),
+    ('source_id', np.int32),
+    ('alive', np.bool_),
+]
+
+class EvidenceTable:
+    """证据热字段的结构化列存
+
+    把检索和过滤会扫描的字段（相关性分数、时间戳、来源）放进
+    一个numpy结构化数组：追加是一次连续的行写入，而各字段仍可
+    通过列视图整列向量化地过滤和排序。dtype在构造时从字段描述
+    编译而来，便于按需扩展行布局。
+    """
+
+    def __init__(self, capacity: int = 64, fields=None):
+        self._dtype = np.dtype(fields or _ROW_FIELDS)
+        self._rows = np.zeros(capacity, dtype=self._dtype)
+        self.size = 0
+
+    @property
+    def relevance(self) -> np.ndarray:
+        return self._rows['relevance']
+
+    @property
+    def timestamp_ns(self) -> np.ndarray:
+        return self._rows['timestamp_ns']
+
+    @property
+    def source_id(self) -> np.ndarray:
+        return self._rows['source_id']
+
+    @property
+    def alive(self) -> np.ndarray:
+        return self._rows['alive']
+
+    def append(self, relevance: float, timestamp_ns: int, source_id: int) -> int:
+        """追加一行，容量不足时倍增扩容，返回行号"""
+        if self.size >= len(self._rows):
+            self._grow()
+        row = self.size
+        # 单次结构化行写入，而不是逐字段的多次存储
+        self._rows[row] = (relevance, timestamp_ns, source_id, True)
+        self.size += 1
+        return row
+
+    def deactivate(self, row: int):
+        """标记某行已删除"""
+        if 0 <= row < self.size:
+            self._rows['alive'][row] = False
+
+    def clear(self):
+        """清空表"""
+        self._rows['alive'][:self.size] = False
+        self.size = 0
+
+    def _grow(self):
+        capacity = max(len(self._rows) * 2, 64)
+        rows = np.zeros(capacity, dtype=self._dtype)
+        rows[:self.size] = self._rows[:self.size]
+        self._rows = rows
+
 class MemoryBank:
     """记忆库"""
     
@@ -77,60 +288,133 @@ class MemoryBank:
         self.config = config
         self.evidence_store: Dict[str, Evidence] = {}
         self.content_index: Dict[str, List[str]] = defaultdict(list)
-        self.source_index: Dict[str, List[str]] = defaultdict(list)
-        self.topic_index: Dict[str, List[str]] = defaultdict(list)
+        # 来源/主题索引用集合存证据ID：成员检查和删除都是O(1)
+        self.source_index: Dict[str, Set[str]] = defaultdict(set)
+        self.topic_index: Dict[str, Set[str]] = defaultdict(set)
         self.url_index: Dict[str, str] = {}  # URL -> Evidence ID mapping
         self.logger = logging.getLogger("webweaver.memory_bank")
         self.max_evidence_count = config.get("max_evidence_count", 1000)
         self.similarity_threshold = config.get("similarity_threshold", 0.7)
+
+        # MinHash/LSH 去重索引
+        # 避免每次插入都与所有已存证据做O(N)的Jaccard比较
+        rng = np.random.RandomState(42)
+        self._hash_a = rng.randint(1, int(_MERSENNE_PRIME), size=_MINHASH_PERMS).astype(np.uint64)
+        self._hash_b = rng.randint(0, int(_MERSENNE_PRIME), size=_MINHASH_PERMS).astype(np.uint64)
+        self._minhash_sigs: Dict[str, np.ndarray] = {}
+        self._lsh_buckets: List[Dict[int, List[str]]] = [defaultdict(list) for _ in range(_LSH_BANDS)]
+
+        # 词汇表和每条证据的token位图
+        # 插入时只分词一次，之后的Jaccard比较通过位运算+popcount完成
+        self._vocab: Dict[str, int] = {}
+        self._bitsets: Dict[str, int] = {}
+
+        # 内容摘要 -> 证据ID，用于O(1)的完全相同内容去重
+        self._content_hashes: Dict[str, str] = {}
+
+        # 字符串ID <-> 内部整数ID映射
+        # content_index的倒排表存整数ID，检索打分可以交给numpy
+        self._int_ids: Dict[str, int] = {}
+        self._str_ids: List[str] = []
+
+        # 热字段列存，行号与内部整数ID对齐
+        self._table = EvidenceTable()
+        self._source_pool: Dict[str, int] = {}
+
+        # 证据ID -> 其出现在content/topic索引中的键
+        # 移除时只需回溯自己的键，而不是扫描整个词表
+        self._index_refs: Dict[str, Dict[str, List[str]]] = {}
+
+        # (时间戳, 证据ID)最小堆，淘汰最旧证据时O(log N)
+        # 已被移除的证据留在堆中惰性删除
+        self._age_heap: List[tuple] = []
     
     def add_evidence(self, evidence: Evidence) -> str:
         """添加证据"""
+        # 只分词一次：MinHash签名和token位图供去重检查和索引复用
+        signature = self._minhash_signature(evidence.content)
+        bitset = self._bitset_for_text(evidence.content)
+
         # 检查是否已存在相同内容
-        if self._is_duplicate(evidence):
-            self.logger.warning(f"Duplicate evidence detected: {evidence.id}")
+        if self._is_duplicate(evidence, signature, bitset):
+            self.logger.warning("Duplicate evidence detected: %s", evidence.id)
             return evidence.id
-        
+
         # 检查存储限制
         if len(self.evidence_store) >= self.max_evidence_count:
             self._remove_oldest_evidence()
-        
+
         # 存储证据
         self.evidence_store[evidence.id] = evidence
-        
+
+        # 分配内部整数ID并写入列存
+        if evidence.id not in self._int_ids:
+            self._int_ids[evidence.id] = len(self._str_ids)
+            self._str_ids.append(evidence.id)
+            self._table.append(
+                evidence.relevance_score, evidence.timestamp,
+                self._intern_source(evidence.source)
+            )
+
+        # 记录年龄信息
+        heapq.heappush(self._age_heap, (evidence.timestamp, evidence.id))
+
         # 更新索引
         self._update_content_index(evidence)
         self._update_source_index(evidence)
         self._update_topic_index(evidence)
         self._update_url_index(evidence)
+        self._index_minhash(evidence.id, signature)
+        self._bitsets[evidence.id] = bitset
+        self._content_hashes[_content_digest(evidence.content.encode('utf-8'))] = evidence.id
         
-        self.logger.info(f"Added evidence: {evidence.id}")
+        self.logger.info("Added evidence: %s", evidence.id)
         return evidence.id
-    
-    def search_evidence(self, query: str, limit: int = 10, 
+
+    def add_evidence_batch(self, evidences: List[Evidence]) -> List[str]:
+        """批量添加证据，返回ID列表（顺序与输入一致）
+
+        单一入口摊薄每条证据的调用开销，调用方（如搜索策略执行）
+        攒够一批后一次提交即可。
+        """
+        ids = [self.add_evidence(evidence) for evidence in evidences]
+        self.logger.info("Added evidence batch of %d items", len(ids))
+        return ids
+
+    def search_evidence(self, query: str, limit: int = 10,
                        source_filter: Optional[str] = None,
-                       min_relevance: float = 0.0) -> List[Evidence]:
-        """搜索证据"""
-        results = []
-        
-        # 基于内容相似度搜索
-        content_matches = self._search_by_content(query)
-        
-        # 基于来源过滤
+                       min_relevance: float = 0.0,
+                       sparse_query: Optional[str] = None,
+                       alpha: float = 0.7) -> List[Evidence]:
+        """搜索证据（sparse_query触发混合打分，见_search_by_content）"""
+        # 基于内容相似度搜索：多取一些候选，给后续过滤留余量
+        int_ids = self._search_by_content(query, limit * 4 if limit else None,
+                                          sparse_query=sparse_query, alpha=alpha)
+        if int_ids.size == 0:
+            return []
+        # 去重：同一证据不重复进入候选（顺序由后面的相关性排序决定）
+        int_ids = np.unique(int_ids)
+
+        # 过滤和排序都在列存上向量化完成
+        mask = self._table.alive[int_ids]
+        relevance = self._table.relevance[int_ids]
+        mask &= relevance >= min_relevance
+
         if source_filter:
-            content_matches = [ev_id for ev_id in content_matches 
-                             if self.evidence_store[ev_id].source == source_filter]
-        
-        # 计算相关性分数并排序
-        for ev_id in content_matches:
-            evidence = self.evidence_store[ev_id]
-            if evidence.relevance_score >= min_relevance:
-                results.append(evidence)
-        
-        # 按相关性分数排序
-        results.sort(key=lambda x: x.relevance_score, reverse=True)
-        
-        return results[:limit]
+            source_id = self._source_pool.get(source_filter, -1)
+            mask &= self._table.source_id[int_ids] == source_id
+
+        int_ids = int_ids[mask]
+        relevance = relevance[mask]
+
+        # 按相关性分数排序，结果多于limit时先argpartition截断
+        if len(int_ids) > limit:
+            top = np.argpartition(-relevance, limit)[:limit]
+            int_ids = int_ids[top]
+            relevance = relevance[top]
+        order = np.argsort(-relevance, kind='stable')
+
+        return [self.evidence_store[self._str_ids[int_id]] for int_id in int_ids[order]]
     
     def get_evidence_by_id(self, evidence_id: str) -> Optional[Evidence]:
         """根据ID获取证据"""
@@ -147,7 +431,22 @@ class MemoryBank:
             return self.get_evidence_by_id(self.url_index[citation])
         
         return None
-    
+
+    def get_evidence_by_citations(self, citations: List[str]) -> Set[str]:
+        """批量解析引用，返回能命中证据的引用集合
+
+        一次调用代替逐条get_evidence_by_citation往返，
+        验证方拿到集合后做成员判断即可。
+        """
+        valid = set()
+        for citation in citations:
+            if citation.startswith("evidence_"):
+                if citation in self.evidence_store:
+                    valid.add(citation)
+            elif citation in self.url_index:
+                valid.add(citation)
+        return valid
+
     def get_evidence_by_url(self, url: str) -> Optional[Evidence]:
         """根据URL获取证据"""
         if url in self.url_index:
@@ -177,15 +476,32 @@ class MemoryBank:
         self.source_index.clear()
         self.topic_index.clear()
         self.url_index.clear()
+        self._minhash_sigs.clear()
+        for bucket in self._lsh_buckets:
+            bucket.clear()
+        self._vocab.clear()
+        self._bitsets.clear()
+        self._content_hashes.clear()
+        self._int_ids.clear()
+        self._str_ids.clear()
+        self._age_heap.clear()
+        self._table.clear()
+        self._source_pool.clear()
+        self._index_refs.clear()
         self.logger.info("Memory bank cleared")
     
     def export_to_dict(self) -> Dict[str, Any]:
         """导出为字典格式"""
         return {
             "evidence_store": {k: v.to_dict() for k, v in self.evidence_store.items()},
-            "content_index": dict(self.content_index),
-            "source_index": dict(self.source_index),
-            "topic_index": dict(self.topic_index),
+            # 倒排表以字符串ID导出：整数ID是本进程的行号，淘汰会在
+            # 行号空间留洞，导入方重新密集编号后原行号就指错行了
+            "content_index": {
+                keyword: [self._str_ids[int_id] for int_id in posting]
+                for keyword, posting in self.content_index.items()
+            },
+            "source_index": {k: sorted(v) for k, v in self.source_index.items()},
+            "topic_index": {k: sorted(v) for k, v in self.topic_index.items()},
             "url_index": self.url_index,
             "config": self.config
         }
@@ -195,37 +511,246 @@ class MemoryBank:
         self.clear()
         
         # 导入证据
-        for ev_id, ev_data in data.get("evidence_store", {}).items():
-            evidence = Evidence.from_dict(ev_data)
-            self.evidence_store[ev_id] = evidence
-        
-        # 导入索引
-        self.content_index = defaultdict(list, data.get("content_index", {}))
-        self.source_index = defaultdict(list, data.get("source_index", {}))
-        self.topic_index = defaultdict(list, data.get("topic_index", {}))
+        items = list(data.get("evidence_store", {}).values())
+        if len(items) >= _PARALLEL_IMPORT_THRESHOLD:
+            # 大批量导入时把from_dict重建分摊到多核
+            workers = os.cpu_count() or 1
+            chunk_size = (len(items) + workers - 1) // workers
+            chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for evidences in executor.map(_rehydrate_chunk, chunks):
+                    for evidence in evidences:
+                        self._store_imported_evidence(evidence)
+        else:
+            for ev_data in items:
+                self._store_imported_evidence(Evidence.from_dict(ev_data))
+
+        # 导入索引：字符串ID翻译到本实例新分配的整数ID，找不到的
+        # 视为死引用丢弃；整数ID是导出方进程的行号，在本实例没有
+        # 意义，同样只在指向有效行时保留（兼容旧的整数ID导出）
+        self.content_index = defaultdict(list)
+        for keyword, posting in data.get("content_index", {}).items():
+            translated = []
+            for entry in posting:
+                if isinstance(entry, str):
+                    int_id = self._int_ids.get(entry)
+                else:
+                    int_id = entry if 0 <= entry < len(self._str_ids) else None
+                if int_id is not None:
+                    translated.append(int_id)
+            self.content_index[keyword] = translated
+        self.source_index = defaultdict(set, {k: set(v) for k, v in data.get("source_index", {}).items()})
+        self.topic_index = defaultdict(set, {k: set(v) for k, v in data.get("topic_index", {}).items()})
         self.url_index = data.get("url_index", {})
         
-        self.logger.info(f"Imported {len(self.evidence_store)} evidence items")
+        self.logger.info("Imported %d evidence items", len(self.evidence_store))
     
-    def _is_duplicate(self, evidence: Evidence) -> bool:
+    def save(self, path: str):
+        """持久化到磁盘（numpy npz格式）
+
+        数值列（分数、时间戳）直接落盘为可mmap的数组，文本列为
+        对象数组，完全绕开JSON编码器。
+        """
+        evidences = list(self.evidence_store.values())
+        np.savez(
+            path,
+            ids=np.array([ev.id for ev in evidences], dtype=object),
+            contents=np.array([ev.content for ev in evidences], dtype=object),
+            summaries=np.array([ev.summary for ev in evidences], dtype=object),
+            sources=np.array([ev.source for ev in evidences], dtype=object),
+            urls=np.array([ev.url for ev in evidences], dtype=object),
+            scores=np.array([ev.relevance_score for ev in evidences], dtype=np.float32),
+            timestamps=np.array([ev.timestamp for ev in evidences], dtype=np.int64),
+            metadata=np.array([json.dumps(ev.metadata, ensure_ascii=False) for ev in evidences], dtype=object),
+        )
+        self.logger.info("Saved %d evidence items to %s", len(evidences), path)
+
+    def load(self, path: str):
+        """从磁盘加载（numpy npz格式），重建全部索引"""
+        if not path.endswith('.npz'):
+            path += '.npz'
+        data = np.load(path, allow_pickle=True)
+
+        self.clear()
+        for i in range(len(data['ids'])):
+            evidence = Evidence(
+                id=str(data['ids'][i]),
+                content=str(data['contents'][i]),
+                summary=str(data['summaries'][i]),
+                source=str(data['sources'][i]),
+                url=str(data['urls'][i]),
+                relevance_score=float(data['scores'][i]),
+                metadata=json.loads(str(data['metadata'][i])),
+                timestamp=int(data['timestamps'][i]),
+            )
+            self._store_imported_evidence(evidence)
+            self._update_content_index(evidence)
+            self._update_source_index(evidence)
+            self._update_topic_index(evidence)
+            self._update_url_index(evidence)
+
+        self.logger.info("Loaded %d evidence items from %s", len(self.evidence_store), path)
+
+    def _store_imported_evidence(self, evidence: Evidence):
+        """存储一条导入的证据并重建其派生索引（不做去重检查）"""
+        self.evidence_store[evidence.id] = evidence
+        self._index_minhash(evidence.id, self._minhash_signature(evidence.content))
+        self._bitsets[evidence.id] = self._bitset_for_text(evidence.content)
+        self._content_hashes[_content_digest(evidence.content.encode('utf-8'))] = evidence.id
+        self._int_ids[evidence.id] = len(self._str_ids)
+        self._str_ids.append(evidence.id)
+        self._table.append(
+            evidence.relevance_score, evidence.timestamp,
+            self._intern_source(evidence.source)
+        )
+        heapq.heappush(self._age_heap, (evidence.timestamp, evidence.id))
+        index_refs = {"keywords": self._extract_keywords(evidence.content)}
+        topics = evidence.metadata.get("topics", [])
+        if topics:
+            index_refs["topics"] = list(topics)
+        self._index_refs[evidence.id] = index_refs
+
+    def _is_duplicate(self, evidence: Evidence, signature: Optional[np.ndarray] = None,
+                      bitset: Optional[int] = None) -> bool:
         """检查是否为重复证据"""
-        # 基于URL检查
-        if evidence.url and evidence.url in self.url_index:
+        # 基于内容摘要的O(1)完全相同检查
+        if _content_digest(evidence.content.encode('utf-8')) in self._content_hashes:
             return True
-        
+
+        # 基于URL检查：已见过的URL是重复；
+        # 带有未见过URL的证据视为新来源，跳过相似度检查
+        # （不同URL的相似内容可能仍有价值，相似度去重留给离线压缩）
+        if evidence.url:
+            return evidence.url in self.url_index
+
         # 基于内容相似度检查
-        for existing_evidence in self.evidence_store.values():
+        # 只与LSH桶中碰撞的候选做精确Jaccard比较，而不是全库扫描
+        if signature is None:
+            signature = self._minhash_signature(evidence.content)
+        if bitset is None:
+            bitset = self._bitset_for_text(evidence.content)
+
+        candidate_ids = self._lsh_candidates(signature)
+        cached_bitsets = []
+        uncached_ids = []
+        for candidate_id in candidate_ids:
+            candidate_bitset = self._bitsets.get(candidate_id)
+            if candidate_bitset is not None:
+                cached_bitsets.append(candidate_bitset)
+            else:
+                uncached_ids.append(candidate_id)
+
+        # 有多个候选时走批量内核，一次比较所有候选
+        if len(cached_bitsets) > 1:
+            query_row, matrix = _pack_bitsets(bitset, cached_bitsets)
+            if np.any(_jaccard_bulk(query_row, matrix) > self.similarity_threshold):
+                return True
+        elif cached_bitsets:
+            if self._bitset_jaccard(bitset, cached_bitsets[0]) > self.similarity_threshold:
+                return True
+
+        for candidate_id in uncached_ids:
+            existing_evidence = self.evidence_store.get(candidate_id)
+            if existing_evidence is None:
+                continue
             if self._calculate_similarity(evidence.content, existing_evidence.content) > self.similarity_threshold:
                 return True
-        
+
         return False
+
+    def _bitset_for_text(self, text: str) -> int:
+        """将文本的token集合编码为词汇表上的位图"""
+        bitset = 0
+        vocab = self._vocab
+        for token in set(self._tokenize(text)):
+            index = vocab.get(token)
+            if index is None:
+                index = len(vocab)
+                vocab[token] = index
+            bitset |= 1 << index
+        return bitset
+
+    @staticmethod
+    def _bitset_jaccard(bitset1: int, bitset2: int) -> float:
+        """基于位运算计算两个token位图的Jaccard相似度"""
+        union = _popcount(bitset1 | bitset2)
+        if not union:
+            return 0.0
+        return _popcount(bitset1 & bitset2) / union
+
+    def _char_shingles(self, text: str) -> List[int]:
+        """文本的字符k-shingle哈希列表
+
+        空格分词对CJK文本会退化为一整句一个token，
+        字符shingle对中英文混合内容都有稳定的相似度语义。
+        """
+        text = text.lower()
+        hashes: List[int] = []
+
+        # CJK片段：短shingle
+        for run in _CJK_RE.findall(text):
+            k = min(_CJK_SHINGLE_K, len(run))
+            hashes.extend(_shingle_hash(run[i:i + k]) for i in range(len(run) - k + 1))
+
+        # 其余文本：压缩空白后取长shingle
+        latin = ' '.join(_CJK_RE.sub(' ', text).split())
+        if latin:
+            k = _LATIN_SHINGLE_K
+            if len(latin) <= k:
+                hashes.append(_shingle_hash(latin))
+            else:
+                hashes.extend(_shingle_hash(latin[i:i + k]) for i in range(len(latin) - k + 1))
+
+        return hashes
+
+    def _minhash_signature(self, text: str) -> Optional[np.ndarray]:
+        """计算文本的MinHash签名"""
+        shingle_hashes = self._char_shingles(text)
+        if not shingle_hashes:
+            return None
+
+        # 每个shingle一个64位哈希，经过128个线性置换哈希后取最小值
+        token_hashes = np.fromiter(
+            (h & int(_HASH_MASK) for h in shingle_hashes),
+            dtype=np.uint64, count=len(shingle_hashes)
+        )
+        products = (self._hash_a[:, None] * token_hashes[None, :] + self._hash_b[:, None]) % _MERSENNE_PRIME
+        return products.min(axis=1)
+
+    def _band_hashes(self, signature: np.ndarray) -> List[int]:
+        """将签名切分为band并计算每个band的哈希"""
+        return [
+            hash(signature[band * _LSH_ROWS:(band + 1) * _LSH_ROWS].tobytes())
+            for band in range(_LSH_BANDS)
+        ]
+
+    def _lsh_candidates(self, signature: Optional[np.ndarray]) -> Set[str]:
+        """查找LSH桶中与签名碰撞的候选证据ID"""
+        if signature is None:
+            return set()
+
+        candidates: Set[str] = set()
+        for band, band_hash in enumerate(self._band_hashes(signature)):
+            bucket = self._lsh_buckets[band].get(band_hash)
+            if bucket:
+                candidates.update(bucket)
+        return candidates
+
+    def _index_minhash(self, evidence_id: str, signature: Optional[np.ndarray]):
+        """将签名插入LSH索引"""
+        if signature is None:
+            return
+
+        self._minhash_sigs[evidence_id] = signature
+        for band, band_hash in enumerate(self._band_hashes(signature)):
+            self._lsh_buckets[band][band_hash].append(evidence_id)
     
     def _calculate_similarity(self, text1: str, text2: str) -> float:
         """计算文本相似度"""
-        # 简单的基于词汇重叠的相似度计算
-        # 实际实现中可以使用更复杂的NLP技术
-        words1 = set(text1.lower().split())
-        words2 = set(text2.lower().split())
+        # 基于token重叠的Jaccard相似度
+        # _tokenize对CJK文本产生字符二元组，空格split()则会退化
+        words1 = set(self._tokenize(text1))
+        words2 = set(self._tokenize(text2))
         
         if not words1 or not words2:
             return 0.0
@@ -237,97 +762,182 @@ class MemoryBank:
     
     def _update_content_index(self, evidence: Evidence):
         """更新内容索引"""
-        # 基于关键词建立索引
+        # 基于关键词建立倒排表，倒排表存内部整数ID
+        int_id = self._int_ids[evidence.id]
         keywords = self._extract_keywords(evidence.content)
         for keyword in keywords:
-            self.content_index[keyword].append(evidence.id)
+            self.content_index[keyword].append(int_id)
+        self._index_refs.setdefault(evidence.id, {})["keywords"] = keywords
     
+    def _intern_source(self, source: str) -> int:
+        """把来源字符串映射为字符串池中的整数ID"""
+        if not source:
+            return -1
+        source_id = self._source_pool.get(source)
+        if source_id is None:
+            source_id = len(self._source_pool)
+            self._source_pool[source] = source_id
+        return source_id
+
     def _update_source_index(self, evidence: Evidence):
         """更新来源索引"""
         if evidence.source:
-            self.source_index[evidence.source].append(evidence.id)
+            self.source_index[evidence.source].add(evidence.id)
     
     def _update_topic_index(self, evidence: Evidence):
         """更新主题索引"""
         # 基于元数据中的主题信息建立索引
         topics = evidence.metadata.get("topics", [])
         for topic in topics:
-            self.topic_index[topic].append(evidence.id)
+            self.topic_index[topic].add(evidence.id)
+        if topics:
+            self._index_refs.setdefault(evidence.id, {})["topics"] = list(topics)
     
     def _update_url_index(self, evidence: Evidence):
         """更新URL索引"""
         if evidence.url:
             self.url_index[evidence.url] = evidence.id
     
-    def _extract_keywords(self, text: str) -> List[str]:
-        """提取关键词"""
-        # 简单的关键词提取
+    def _tokenize(self, text: str) -> List[str]:
+        """将文本切分为去除停用词后的token列表"""
+        # 简单的分词实现
         # 实际实现中可以使用更复杂的NLP技术
-        import re
-        
+
         # 移除标点符号，转换为小写
-        text = re.sub(r'[^\w\s]', '', text.lower())
-        words = text.split()
-        
+        text = _PUNCT_RE.sub('', text.lower())
+
         # 过滤停用词和短词
-        stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should'}
-        
-        keywords = [word for word in words if len(word) > 2 and word not in stop_words]
-        
+        tokens = [word for word in text.split()
+                  if len(word) > 2 and word not in _STOP_WORDS]
+
+        # 中文等CJK文本没有空格分词，按字符二元组补充token，
+        # 否则整句会被当作单个token，内容索引对中文内容基本失效
+        for run in _CJK_RE.findall(text):
+            if len(run) == 1:
+                tokens.append(run)
+            else:
+                tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+
+        return tokens
+
+    def _extract_keywords(self, text: str) -> List[str]:
+        """提取关键词"""
+        keywords = self._tokenize(text)
+
         # 返回前10个最频繁的关键词
-        from collections import Counter
         word_counts = Counter(keywords)
         return [word for word, count in word_counts.most_common(10)]
     
-    def _search_by_content(self, query: str) -> List[str]:
-        """基于内容搜索"""
-        query_keywords = self._extract_keywords(query)
-        evidence_scores = defaultdict(float)
-        
-        for keyword in query_keywords:
-            if keyword in self.content_index:
-                for ev_id in self.content_index[keyword]:
-                    evidence_scores[ev_id] += 1.0
-        
-        # 按分数排序
-        sorted_evidence = sorted(evidence_scores.items(), key=lambda x: x[1], reverse=True)
-        return [ev_id for ev_id, score in sorted_evidence]
+    def _keyword_hit_scores(self, keywords: List[str]) -> np.ndarray:
+        """按关键词命中数为所有证据打分（bincount在C层完成）"""
+        postings_lists = [self.content_index[kw] for kw in keywords
+                          if kw in self.content_index]
+        if not postings_lists:
+            return np.empty(0, dtype=np.float64)
+
+        postings = np.concatenate([np.asarray(p, dtype=np.int32) for p in postings_lists])
+        return np.bincount(postings).astype(np.float64)
+
+    def _search_by_content(self, query: str, limit: Optional[int] = None,
+                           sparse_query: Optional[str] = None,
+                           alpha: float = 0.7) -> np.ndarray:
+        """基于内容搜索，返回按关键词命中数排序的内部整数ID数组
+
+        提供sparse_query时做混合打分：alpha·主查询 + (1-alpha)·关键词查询，
+        两路分数各自按最大值归一后再加权，专有名词等稀有词的精确命中
+        不会被长自然语言查询的词频淹没。
+        """
+        scores = self._keyword_hit_scores(self._extract_keywords(query))
+
+        if sparse_query:
+            sparse_scores = self._keyword_hit_scores(self._extract_keywords(sparse_query))
+            if sparse_scores.size or scores.size:
+                n = max(len(scores), len(sparse_scores))
+                scores = np.pad(scores, (0, n - len(scores)))
+                sparse_scores = np.pad(sparse_scores, (0, n - len(sparse_scores)))
+                if scores.max(initial=0.0) > 0:
+                    scores /= scores.max()
+                if sparse_scores.max(initial=0.0) > 0:
+                    sparse_scores /= sparse_scores.max()
+                scores = alpha * scores + (1.0 - alpha) * sparse_scores
+
+        if scores.size == 0:
+            return np.empty(0, dtype=np.int64)
+
+        # 指定limit时先argpartition截取top-k，避免对全部候选argsort
+        # 关键词命中数并列时用相关性分数破平，避免截断丢掉高分证据
+        if limit is not None and limit < len(scores):
+            # 相关性只做破平（系数远小于混合打分路径上的最小分差）
+            combined = scores * 2.0 + self._table.relevance[:len(scores)] * (scores > 0) * 1e-3
+            top = np.argpartition(-combined, limit)[:limit]
+            top = top[scores[top] > 0]
+            return top[np.argsort(-combined[top], kind='stable')]
+
+        order = np.argsort(-scores, kind='stable')
+        return order[scores[order] > 0]
     
     def _remove_oldest_evidence(self):
         """移除最旧的证据"""
-        if not self.evidence_store:
+        # 从最小堆弹出最旧的证据，跳过已被移除的惰性条目
+        while self._age_heap:
+            _, oldest_id = heapq.heappop(self._age_heap)
+            evidence = self.evidence_store.get(oldest_id)
+            if evidence is None:
+                continue
+
+            # 移除证据
+            del self.evidence_store[oldest_id]
+
+            # 更新索引
+            self._remove_from_indexes(evidence)
+
+            self.logger.info("Removed oldest evidence: %s", oldest_id)
             return
-        
-        # 找到最旧的证据
-        oldest_id = min(self.evidence_store.keys(), 
-                       key=lambda x: self.evidence_store[x].timestamp)
-        
-        # 移除证据
-        evidence = self.evidence_store[oldest_id]
-        del self.evidence_store[oldest_id]
-        
-        # 更新索引
-        self._remove_from_indexes(evidence)
-        
-        self.logger.info(f"Removed oldest evidence: {oldest_id}")
     
     def _remove_from_indexes(self, evidence: Evidence):
         """从所有索引中移除证据"""
-        # 从内容索引移除
-        for keyword, ev_ids in self.content_index.items():
-            if evidence.id in ev_ids:
-                ev_ids.remove(evidence.id)
-        
+        index_refs = self._index_refs.pop(evidence.id, {})
+
+        # 从内容索引和列存移除：只回溯自己的关键词
+        int_id = self._int_ids.pop(evidence.id, None)
+        if int_id is not None:
+            self._table.deactivate(int_id)
+            for keyword in index_refs.get("keywords", ()):
+                posting = self.content_index.get(keyword)
+                if posting and int_id in posting:
+                    posting.remove(int_id)
+                    if not posting:
+                        del self.content_index[keyword]
+
         # 从来源索引移除
-        if evidence.source in self.source_index:
-            if evidence.id in self.source_index[evidence.source]:
-                self.source_index[evidence.source].remove(evidence.id)
-        
-        # 从主题索引移除
-        for topic, ev_ids in self.topic_index.items():
-            if evidence.id in ev_ids:
-                ev_ids.remove(evidence.id)
+        ev_ids = self.source_index.get(evidence.source)
+        if ev_ids is not None:
+            ev_ids.discard(evidence.id)
+            if not ev_ids:
+                del self.source_index[evidence.source]
+
+        # 从主题索引移除：只回溯自己的主题
+        for topic in index_refs.get("topics", ()):
+            ev_ids = self.topic_index.get(topic)
+            if ev_ids is not None:
+                ev_ids.discard(evidence.id)
+                if not ev_ids:
+                    del self.topic_index[topic]
         
         # 从URL索引移除
         if evidence.url in self.url_index:
             del self.url_index[evidence.url]
+
+        # 从MinHash/LSH索引移除
+        signature = self._minhash_sigs.pop(evidence.id, None)
+        if signature is not None:
+            for band, band_hash in enumerate(self._band_hashes(signature)):
+                bucket = self._lsh_buckets[band].get(band_hash)
+                if bucket and evidence.id in bucket:
+                    bucket.remove(evidence.id)
+
+        # 移除token位图缓存
+        self._bitsets.pop(evidence.id, None)
+
+        # 移除内容摘要
+        self._content_hashes.pop(_content_digest(evidence.content.encode('utf-8')), None)
@@ -7,13 +7,55 @@
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass, field
 import json
-import re
 from datetime import datetime
 
 from .base_agent import BaseAgent
 from .memory_bank import MemoryBank, Evidence
 
-@dataclass
+try:
+    # 可选依赖：orjson解析LLM返回的JSON比标准库快数倍
+    import orjson
+except ImportError:
+    orjson = None
+
+def _extract_json_span(s: str, open_ch: str = '{', close_ch: str = '}') -> Optional[str]:
+    """从文本中截取第一个完整的JSON对象/数组
+
+    线性括号计数扫描（跳过字符串字面量内的括号），
+    对带前后缀说明文字的LLM响应比贪婪DOTALL正则便宜且无回溯。
+    """
+    start = s.find(open_ch)
+    if start == -1:
+        return None
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(s)):
+        ch = s[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == '\\':
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == open_ch:
+            depth += 1
+        elif ch == close_ch:
+            depth -= 1
+            if depth == 0:
+                return s[start:i + 1]
+    return None
+
+def _fast_loads(s: str) -> Any:
+    """解析JSON字符串，优先使用orjson"""
+    if orjson is not None:
+        return orjson.loads(s)
+    return json.loads(s)
+
+@dataclass(slots=True)
 class Section:
     """章节类"""
     id: str
@@ -28,44 +70,69 @@ class Section:
     is_complete: bool = False
     
     def to_dict(self) -> Dict[str, Any]:
-        """转换为字典格式"""
-        return {
-            "id": self.id,
-            "title": self.title,
-            "description": self.description,
-            "level": self.level,
-            "parent_id": self.parent_id,
-            "children": [child.to_dict() for child in self.children],
-            "requirements": self.requirements,
-            "citations": self.citations,
-            "content": self.content,
-            "is_complete": self.is_complete
-        }
-    
+        """转换为字典格式
+
+        显式后序遍历代替递归：深层大纲不再逐层进入Python调用帧，
+        每个节点只构造一次目标字典。
+        """
+        done: Dict[int, Dict[str, Any]] = {}
+        stack = [(self, False)]
+        while stack:
+            node, visited = stack.pop()
+            if not visited:
+                stack.append((node, True))
+                for child in node.children:
+                    stack.append((child, False))
+            else:
+                children_out = [None] * len(node.children)
+                for i, child in enumerate(node.children):
+                    children_out[i] = done[id(child)]
+                done[id(node)] = {
+                    "id": node.id,
+                    "title": node.title,
+                    "description": node.description,
+                    "level": node.level,
+                    "parent_id": node.parent_id,
+                    "children": children_out,
+                    "requirements": node.requirements,
+                    "citations": node.citations,
+                    "content": node.content,
+                    "is_complete": node.is_complete
+                }
+        return done[id(self)]
+
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Section':
-        """从字典创建实例"""
-        section = cls(
-            id=data["id"],
-            title=data["title"],
-            description=data["description"],
-            level=data["level"],
-            parent_id=data.get("parent_id"),
-            requirements=data.get("requirements", []),
-            citations=data.get("citations", []),
-            content=data.get("content", ""),
-            is_complete=data.get("is_complete", False)
-        )
-        
-        # 递归创建子章节
-        for child_data in data.get("children", []):
-            child = cls.from_dict(child_data)
-            child.parent_id = section.id
-            section.children.append(child)
-        
-        return section
+        """从字典创建实例
 
-@dataclass
+        显式工作队列代替递归构建，深层大纲不受Python递归深度限制。
+        """
+        root: Optional[Section] = None
+        # (节点数据, 父节点id, 挂载目标列表)
+        queue = [(data, data.get("parent_id"), None)]
+        while queue:
+            node_data, parent_id, dest = queue.pop()
+            section = cls(
+                id=node_data["id"],
+                title=node_data["title"],
+                description=node_data["description"],
+                level=node_data["level"],
+                parent_id=parent_id,
+                requirements=node_data.get("requirements", []),
+                citations=node_data.get("citations", []),
+                content=node_data.get("content", ""),
+                is_complete=node_data.get("is_complete", False)
+            )
+            if dest is None:
+                root = section
+            else:
+                dest.append(section)
+            # 逆序入栈，LIFO弹出后保持子章节原始顺序
+            for child_data in reversed(node_data.get("children", [])):
+                queue.append((child_data, section.id, section.children))
+        return root
+
+@dataclass(slots=True)
 class Outline:
     """大纲类"""
     title: str
@@ -75,58 +142,103 @@ class Outline:
     created_at: datetime = field(default_factory=datetime.now)
     updated_at: datetime = field(default_factory=datetime.now)
     version: int = 1
-    
+    # 惰性构建的 id -> Section 索引，树被修改时置脏后重建
+    _section_index: Optional[Dict[str, 'Section']] = field(default=None, init=False, repr=False)
+    _dirty: bool = field(default=True, init=False, repr=False)
+    # 按version缓存的JSON序列化结果：同一迭代内多个提示词复用
+    _json_cache: Optional[tuple] = field(default=None, init=False, repr=False)
+    # 完整性计数器：随索引重建一并统计，检查时O(1)
+    _n_total: int = field(default=0, init=False, repr=False)
+    _n_complete: int = field(default=0, init=False, repr=False)
+
     def add_section(self, section: Section):
         """添加章节"""
         self.sections.append(section)
         self.updated_at = datetime.now()
         self.version += 1
-    
+        self._dirty = True
+
+    def _rebuild_section_index(self):
+        """用显式栈一次遍历全树重建索引（避免递归调用帧）
+
+        同一趟遍历里顺带统计完整性计数器。
+        """
+        index: Dict[str, Section] = {}
+        n_complete = 0
+        stack = list(self.sections)
+        # 把方法绑定到局部变量，紧循环内省掉每次的属性查找
+        pop = stack.pop
+        extend = stack.extend
+        while stack:
+            section = pop()
+            index[section.id] = section
+            if section.is_complete:
+                n_complete += 1
+            extend(section.children)
+        self._section_index = index
+        self._n_total = len(index)
+        self._n_complete = n_complete
+        self._dirty = False
+
     def get_section_by_id(self, section_id: str) -> Optional[Section]:
         """根据ID获取章节"""
-        for section in self.sections:
-            if section.id == section_id:
-                return section
-            # 递归搜索子章节
-            found = self._find_section_recursive(section, section_id)
-            if found:
-                return found
-        return None
-    
-    def _find_section_recursive(self, section: Section, section_id: str) -> Optional[Section]:
-        """递归查找章节"""
-        for child in section.children:
-            if child.id == section_id:
-                return child
-            found = self._find_section_recursive(child, section_id)
-            if found:
-                return found
-        return None
-    
+        if self._dirty or self._section_index is None:
+            self._rebuild_section_index()
+        return self._section_index.get(section_id)
+
+    def iter_sections(self):
+        """惰性遍历所有章节（包括子章节），前序顺序
+
+        生成器版本：只迭代不需要落地临时列表的调用方用它。
+        """
+        stack = list(reversed(self.sections))
+        while stack:
+            section = stack.pop()
+            yield section
+            stack.extend(reversed(section.children))
+
     def get_all_sections(self) -> List[Section]:
-        """获取所有章节（包括子章节）"""
-        all_sections = []
-        for section in self.sections:
-            all_sections.append(section)
-            all_sections.extend(self._get_sections_recursive(section))
-        return all_sections
-    
-    def _get_sections_recursive(self, section: Section) -> List[Section]:
-        """递归获取子章节"""
-        sections = []
-        for child in section.children:
-            sections.append(child)
-            sections.extend(self._get_sections_recursive(child))
-        return sections
+        """获取所有章节（包括子章节），前序遍历"""
+        return list(self.iter_sections())
     
+    def to_json(self) -> str:
+        """序列化为JSON字符串（按version缓存）
+
+        大纲在一次研究迭代内被多个提示词重复序列化，version不变时
+        直接返回缓存结果，省掉整棵树的遍历和JSON编码。
+        输出紧凑格式：编码更快、提示词更短，LLM解析不受影响。
+        """
+        if self._json_cache is not None and self._json_cache[0] == self.version:
+            return self._json_cache[1]
+        if orjson is not None:
+            serialized = orjson.dumps(self.to_dict()).decode('utf-8')
+        else:
+            serialized = json.dumps(self.to_dict(), ensure_ascii=False, separators=(',', ':'))
+        self._json_cache = (self.version, serialized)
+        return serialized
+
+    def mark_complete(self, section_id: str) -> Optional[Section]:
+        """标记章节完成并增量维护完整性计数器"""
+        section = self.get_section_by_id(section_id)
+        if section is not None and not section.is_complete:
+            section.is_complete = True
+            self._n_complete += 1
+        return section
+
+    @property
+    def section_count(self) -> int:
+        """章节总数（含子章节），读缓存计数器而非遍历全树"""
+        if self._dirty or self._section_index is None:
+            self._rebuild_section_index()
+        return self._n_total
+
     def calculate_completeness(self) -> float:
-        """计算大纲完整性"""
-        all_sections = self.get_all_sections()
-        if not all_sections:
+        """计算大纲完整性（O(1)，计数器在索引重建时统计）"""
+        if self._dirty or self._section_index is None:
+            self._rebuild_section_index()
+        if not self._n_total:
             return 0.0
-        
-        completed_sections = sum(1 for section in all_sections if section.is_complete)
-        return completed_sections / len(all_sections)
+        return self._n_complete / self._n_total
     
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典格式"""
@@ -233,30 +345,29 @@ class PlannerAgent(BaseAgent):
         return strategy_data
     
     def should_continue_research(self) -> bool:
-        """判断是否继续研究"""
+        """判断是否继续研究（检查按代价从低到高排列）"""
         # 检查迭代次数限制
         if self.state.iteration_count >= self.max_iterations:
             self.logger.info("Reached maximum iterations")
             return False
-        
-        # 检查大纲完整性
+
+        # 没有大纲时继续
         if not self.current_outline:
             return True
-        
+
+        # 检查是否有新的搜索策略（纯列表访问，先于完整性计算）
+        if self.search_history:
+            last_strategy = self.search_history[-1]["strategy"]
+            if not last_strategy or len(last_strategy) == 0:
+                self.logger.info("No more search strategies available")
+                return False
+
+        # 检查大纲完整性（计数器缓存后为O(1)，但仍放在最后）
         completeness = self.current_outline.calculate_completeness()
         if completeness >= self.completeness_threshold:
             self.logger.info(f"Outline completeness reached: {completeness:.2f}")
             return False
-        
-        # 检查是否有新的搜索策略
-        if not self.search_history:
-            return True
-        
-        last_strategy = self.search_history[-1]["strategy"]
-        if not last_strategy or len(last_strategy) == 0:
-            self.logger.info("No more search strategies available")
-            return False
-        
+
         return True
     
     def get_current_outline(self) -> Optional[Outline]:
@@ -313,7 +424,7 @@ class PlannerAgent(BaseAgent):
 基于新获取的证据，请优化当前的研究大纲：
 
 当前大纲:
-{json.dumps(outline.to_dict(), ensure_ascii=False, indent=2)}
+{outline.to_json()}
 
 新证据:
 {chr(10).join(evidence_summaries)}
@@ -333,7 +444,7 @@ class PlannerAgent(BaseAgent):
 基于当前研究大纲，请制定详细的搜索策略：
 
 当前大纲:
-{json.dumps(outline.to_dict(), ensure_ascii=False, indent=2)}
+{outline.to_json()}
 
 请为每个需要更多信息的章节制定搜索策略，包括：
 1. 具体的搜索关键词
@@ -358,15 +469,17 @@ class PlannerAgent(BaseAgent):
         """解析大纲响应"""
         try:
             # 尝试直接解析JSON
-            return json.loads(response)
-        except json.JSONDecodeError:
+            return _fast_loads(response)
+        except (json.JSONDecodeError, ValueError):
             # 尝试提取JSON部分
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group())
-            else:
-                self.logger.error("Failed to parse outline response")
-                return {"title": "解析失败", "sections": []}
+            fragment = _extract_json_span(response, '{', '}')
+            if fragment:
+                try:
+                    return _fast_loads(fragment)
+                except (json.JSONDecodeError, ValueError):
+                    pass
+            self.logger.error("Failed to parse outline response")
+            return {"title": "解析失败", "sections": []}
     
     def _parse_outline_optimization_response(self, response: str) -> Dict[str, Any]:
         """解析大纲优化响应"""
@@ -375,54 +488,50 @@ class PlannerAgent(BaseAgent):
     def _parse_search_strategy_response(self, response: str) -> List[Dict[str, Any]]:
         """解析搜索策略响应"""
         try:
-            return json.loads(response)
-        except json.JSONDecodeError:
-            json_match = re.search(r'\[.*\]', response, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group())
-            else:
-                self.logger.error("Failed to parse search strategy response")
-                return []
+            return _fast_loads(response)
+        except (json.JSONDecodeError, ValueError):
+            fragment = _extract_json_span(response, '[', ']')
+            if fragment:
+                try:
+                    return _fast_loads(fragment)
+                except (json.JSONDecodeError, ValueError):
+                    pass
+            self.logger.error("Failed to parse search strategy response")
+            return []
     
     def _create_sections_from_data(self, sections_data: List[Dict[str, Any]]) -> List[Section]:
-        """从数据创建章节"""
-        sections = []
-        for section_data in sections_data:
+        """从数据创建章节
+
+        显式工作栈一次性建整棵树，不再逐层递归。
+        """
+        sections: List[Section] = []
+        # (节点数据, 父节点id, 挂载目标列表)
+        stack = [(data, None, sections) for data in reversed(sections_data)]
+        pop = stack.pop
+        push = stack.append
+        while stack:
+            section_data, parent_id, dest = pop()
+            if parent_id is None:
+                default_id = f"section_{len(sections) + 1}"
+                default_level = 1
+            else:
+                default_id = f"section_{parent_id}_{len(section_data)}"
+                default_level = 2
             section = Section(
-                id=section_data.get("id", f"section_{len(sections) + 1}"),
+                id=section_data.get("id", default_id),
                 title=section_data.get("title", ""),
                 description=section_data.get("description", ""),
-                level=section_data.get("level", 1),
+                level=section_data.get("level", default_level),
+                parent_id=parent_id,
                 requirements=section_data.get("requirements", [])
             )
-            
-            # 递归创建子章节
-            for child_data in section_data.get("children", []):
-                child = self._create_section_from_data(child_data, section.id)
-                section.children.append(child)
-            
-            sections.append(section)
-        
+            dest.append(section)
+            # 逆序入栈，LIFO弹出后保持子章节原始顺序
+            for child_data in reversed(section_data.get("children", [])):
+                push((child_data, section.id, section.children))
+
         return sections
     
-    def _create_section_from_data(self, section_data: Dict[str, Any], parent_id: str) -> Section:
-        """从数据创建单个章节"""
-        section = Section(
-            id=section_data.get("id", f"section_{parent_id}_{len(section_data)}"),
-            title=section_data.get("title", ""),
-            description=section_data.get("description", ""),
-            level=section_data.get("level", 2),
-            parent_id=parent_id,
-            requirements=section_data.get("requirements", [])
-        )
-        
-        # 递归创建子章节
-        for child_data in section_data.get("children", []):
-            child = self._create_section_from_data(child_data, section.id)
-            section.children.append(child)
-        
-        return section
-    
     def _apply_outline_optimization(self, optimization_data: Dict[str, Any]) -> Outline:
         """应用大纲优化"""
         if not self.current_outline:
@@ -6,6 +6,8 @@ WebWeaver 主系统
 
 from typing import Dict, Any, Optional, List
 from dataclasses import dataclass, field
+import asyncio
+import re
 import time
 import json
 from datetime import datetime
@@ -17,7 +19,7 @@ from .memory_bank import MemoryBank, Evidence
 from ..tools.search_engine import BaseSearchEngine, WebSearchEngine, AcademicSearchEngine
 from ..tools.web_scraper import WebScraper
 
-@dataclass
+@dataclass(slots=True)
 class ResearchResult:
     """研究结果"""
     query: str
@@ -59,6 +61,13 @@ class WebWeaver:
         self.current_query = ""
         self.research_start_time = None
         self.research_iterations = 0
+
+        # 每次research()内的抓取缓存与已见URL集合：
+        # 不同策略/迭代经常命中相同URL，一次缓存命中省掉整个HTTP往返
+        self._scrape_cache: Dict[str, Optional[dict]] = {}
+        self._seen_urls: set = set()
+        # 关键词组 -> 编译后的交替正则
+        self._kw_re_cache: Dict[tuple, Any] = {}
         
         self.logger = self._setup_logger()
     
@@ -76,7 +85,7 @@ class WebWeaver:
         
         # 生成初始大纲
         outline = self.planner.generate_initial_outline(query)
-        self.logger.info(f"Generated initial outline with {len(outline.get_all_sections())} sections")
+        self.logger.info(f"Generated initial outline with {outline.section_count} sections")
         
         # 研究循环
         max_iter = max_iterations or self.config.get("max_iterations", 5)
@@ -127,38 +136,123 @@ class WebWeaver:
         return result
     
     def _execute_search_strategies(self, strategies: List[Dict[str, Any]]) -> List[Evidence]:
-        """执行搜索策略"""
-        all_evidence = []
-        
+        """执行搜索策略（并发执行所有策略，同步入口）"""
+        if not strategies:
+            return []
+        return asyncio.run(self._execute_search_strategies_async(strategies))
+
+    async def _execute_search_strategies_async(self, strategies: List[Dict[str, Any]]) -> List[Evidence]:
+        """并发执行搜索策略
+
+        策略之间、以及策略内各搜索结果的抓取之间都是网络I/O，
+        用asyncio.gather重叠等待时间；抓取并发由信号量
+        （config中的scrape_concurrency，默认8）限制。
+        """
+        semaphore = asyncio.Semaphore(self.config.get("scrape_concurrency", 8))
+
+        # 按搜索引擎分组：同一引擎的多条查询走一次批量调用，
+        # 省掉每条查询各自的TLS握手/会话开销
+        groups: Dict[str, List[Dict[str, Any]]] = {}
         for strategy in strategies:
-            try:
-                # 选择搜索引擎
-                search_engine = self._select_search_engine(strategy.get("search_type", "web"))
-                
-                if not search_engine:
-                    self.logger.warning(f"No search engine available for type: {strategy.get('search_type')}")
-                    continue
-                
-                # 执行搜索
-                keywords = strategy.get("keywords", [])
-                search_query = " ".join(keywords)
-                
-                self.logger.info(f"Searching for: {search_query}")
-                search_results = search_engine.search(search_query, num_results=5)
-                
-                # 处理搜索结果
-                for result in search_results:
-                    evidence = self._process_search_result(result, strategy)
-                    if evidence:
-                        evidence_id = self.memory_bank.add_evidence(evidence)
-                        all_evidence.append(evidence)
-                        self.logger.debug(f"Added evidence: {evidence_id}")
-                
-            except Exception as e:
-                self.logger.error(f"Error executing search strategy: {e}")
+            search_type = strategy.get("search_type", "web")
+            if not self._select_search_engine(search_type):
+                self.logger.warning("No search engine available for type: %s", search_type)
                 continue
-        
+            groups.setdefault(search_type, []).append(strategy)
+
+        results = await asyncio.gather(
+            *(self._execute_engine_group_async(search_type, group, semaphore)
+              for search_type, group in groups.items()),
+            return_exceptions=True
+        )
+
+        all_evidence = []
+        for result in results:
+            if isinstance(result, Exception):
+                self.logger.error("Error executing search strategy: %s", result)
+                continue
+            all_evidence.extend(result)
+
         return all_evidence
+
+    async def _execute_engine_group_async(self, search_type: str,
+                                          strategies: List[Dict[str, Any]],
+                                          semaphore: asyncio.Semaphore) -> List[Evidence]:
+        """在一个搜索引擎上执行一组策略的查询"""
+        search_engine = self._select_search_engine(search_type)
+        queries = [" ".join(strategy.get("keywords", [])) for strategy in strategies]
+
+        self.logger.info("Searching %d queries via %s engine", len(queries), search_type)
+
+        # 引擎支持批量接口时一次调用搞定；否则各查询并发转线程
+        batch_search = getattr(search_engine, "batch_search", None)
+        if batch_search is not None:
+            results_per_query = await asyncio.to_thread(batch_search, queries, 5)
+        else:
+            results_per_query = await asyncio.gather(
+                *(asyncio.to_thread(search_engine.search, query, 5) for query in queries)
+            )
+
+        # 按索引把结果配回各自的策略，并发处理
+        processed = await asyncio.gather(
+            *(self._process_strategy_results_async(strategy, search_results, semaphore)
+              for strategy, search_results in zip(strategies, results_per_query)),
+            return_exceptions=True
+        )
+
+        all_evidence = []
+        for result in processed:
+            if isinstance(result, Exception):
+                self.logger.error("Error executing search strategy: %s", result)
+                continue
+            all_evidence.extend(result)
+        return all_evidence
+
+    async def _process_strategy_results_async(self, strategy: Dict[str, Any],
+                                              search_results: List[Any],
+                                              semaphore: asyncio.Semaphore) -> List[Evidence]:
+        """处理单条策略的搜索结果：去重后并发抓取入库"""
+        # 跨策略去重：同一URL只抓取并入库一次
+        # （在事件循环线程中登记，天然避免并发重复调度）
+        fresh_results = []
+        for result in search_results:
+            if result.url in self._seen_urls:
+                continue
+            self._seen_urls.add(result.url)
+            fresh_results.append(result)
+
+        # 时间戳整批算一次：datetime.now()+isoformat不必每条结果各付一次
+        scraped_at = datetime.now().isoformat()
+
+        # 并发处理搜索结果
+        evidences = await asyncio.gather(
+            *(self._process_search_result_async(result, strategy, semaphore, scraped_at)
+              for result in fresh_results),
+            return_exceptions=True
+        )
+
+        collected = []
+        for evidence in evidences:
+            if isinstance(evidence, Exception):
+                self.logger.error("Error processing search result: %s", evidence)
+                continue
+            if evidence is None:
+                continue
+            collected.append(evidence)
+
+        # 攒成一批写入MemoryBank（保持在事件循环线程中，避免并发修改索引）
+        if collected:
+            evidence_ids = self.memory_bank.add_evidence_batch(collected)
+            self.logger.debug("Added evidence batch: %s", evidence_ids)
+
+        return collected
+
+    async def _process_search_result_async(self, result, strategy: Dict[str, Any],
+                                           semaphore: asyncio.Semaphore,
+                                           scraped_at: Optional[str] = None) -> Optional[Evidence]:
+        """异步处理单条搜索结果（抓取在线程池中进行，受信号量限流）"""
+        async with semaphore:
+            return await asyncio.to_thread(self._process_search_result, result, strategy, scraped_at)
     
     def _select_search_engine(self, search_type: str) -> Optional[BaseSearchEngine]:
         """选择搜索引擎"""
@@ -169,14 +263,19 @@ class WebWeaver:
         else:
             return self.search_engines.get("web")  # 默认使用网络搜索
     
-    def _process_search_result(self, result, strategy: Dict[str, Any]) -> Optional[Evidence]:
+    def _process_search_result(self, result, strategy: Dict[str, Any],
+                               scraped_at: Optional[str] = None) -> Optional[Evidence]:
         """处理搜索结果"""
         try:
-            # 抓取网页内容
-            scraped_content = self.web_scraper.scrape_url(result.url)
-            
+            # 抓取网页内容（按URL缓存，重复URL不再发起请求）
+            if result.url in self._scrape_cache:
+                scraped_content = self._scrape_cache[result.url]
+            else:
+                scraped_content = self.web_scraper.scrape_url(result.url)
+                self._scrape_cache[result.url] = scraped_content
+
             if not scraped_content:
-                self.logger.warning(f"Failed to scrape content from: {result.url}")
+                self.logger.warning("Failed to scrape content from: %s", result.url)
                 return None
             
             # 创建证据
@@ -188,7 +287,7 @@ class WebWeaver:
                 relevance_score=self._calculate_relevance_score(result, strategy),
                 metadata={
                     "search_strategy": strategy,
-                    "scraped_at": datetime.now().isoformat(),
+                    "scraped_at": scraped_at or datetime.now().isoformat(),
                     "original_title": result.title
                 }
             )
@@ -196,42 +295,50 @@ class WebWeaver:
             return evidence
             
         except Exception as e:
-            self.logger.error(f"Error processing search result: {e}")
+            self.logger.error("Error processing search result: %s", e)
             return None
     
     def _calculate_relevance_score(self, result, strategy: Dict[str, Any]) -> float:
         """计算相关性分数"""
         # 简单的相关性计算
         # 实际实现中可以使用更复杂的NLP技术
-        
+
         score = 0.0
-        
-        # 基于标题匹配
-        title = result.title.lower()
-        keywords = [kw.lower() for kw in strategy.get("keywords", [])]
-        
-        for keyword in keywords:
-            if keyword in title:
-                score += 0.3
-        
-        # 基于摘要匹配
-        snippet = result.snippet.lower()
-        for keyword in keywords:
-            if keyword in snippet:
-                score += 0.2
-        
+
+        keywords = strategy.get("keywords", [])
+        if keywords:
+            # 关键词编译成一个交替正则并按关键词组缓存：
+            # 每段文本只扫一遍，而不是每个关键词各扫一遍。
+            # 缓存放在实例上，策略dict会进Evidence元数据，不能塞正则对象
+            cache_key = tuple(keywords)
+            pattern = self._kw_re_cache.get(cache_key)
+            if pattern is None:
+                # 长关键词优先，避免短关键词作为前缀抢先匹配
+                alternatives = sorted((kw.lower() for kw in keywords), key=len, reverse=True)
+                pattern = re.compile("|".join(re.escape(kw) for kw in alternatives))
+                self._kw_re_cache[cache_key] = pattern
+
+            # 基于标题匹配（每个关键词最多计一次，与原逐词in语义一致）
+            title_hits = len(set(pattern.findall(result.title.lower())))
+            score += 0.3 * title_hits
+
+            # 基于摘要匹配
+            snippet_hits = len(set(pattern.findall(result.snippet.lower())))
+            score += 0.2 * snippet_hits
+
         # 基于优先级
         priority = strategy.get("priority", 1)
         score += (5 - priority) * 0.1
-        
+
         return min(score, 1.0)
     
     def _extract_all_citations(self, report: Report) -> List[str]:
-        """提取所有引用"""
-        all_citations = []
-        for section in report.sections:
-            all_citations.extend(section.citations)
-        return list(set(all_citations))  # 去重
+        """提取所有引用（dict当有序集合用：去重且保持出现顺序）"""
+        seen: Dict[str, None] = {}
+        for section in report.iter_sections():
+            for citation in section.citations:
+                seen[citation] = None
+        return list(seen)
     
     def _initialize_search_engines(self, search_config: Dict[str, Any]) -> Dict[str, BaseSearchEngine]:
         """初始化搜索引擎"""
@@ -262,6 +369,8 @@ class WebWeaver:
         self.writer.written_sections.clear()
         self.writer.current_report = None
         self.research_iterations = 0
+        self._scrape_cache.clear()
+        self._seen_urls.clear()
     
     def _setup_logger(self):
         """设置日志记录器"""
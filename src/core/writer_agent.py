@@ -5,15 +5,140 @@
 """
 
 from typing import List, Dict, Any, Optional
+from collections import OrderedDict
 from dataclasses import dataclass, field
+from itertools import chain
+import asyncio
 import re
 import json
+import time
 from datetime import datetime
 
-from .base_agent import BaseAgent
-from .memory_bank import MemoryBank, Evidence
+try:
+    # 可选依赖：orjson原生支持datetime，序列化报告比标准库快数倍
+    import orjson
+except ImportError:  # pragma: no cover - 可选加速依赖
+    orjson = None
+
+try:
+    # 可选依赖：Hyperscan的JIT化DFA对长文本做流式匹配接近memcpy吞吐，
+    # 批量校验归档报告时比Python的回溯引擎快一个量级以上
+    import hyperscan
+except ImportError:  # pragma: no cover - 可选加速依赖
+    hyperscan = None
+
+from .base_agent import BaseAgent, PROMPT_PREFIX_DELIMITER
+from .memory_bank import MemoryBank, Evidence, evidence_lines
 from .planner_agent import Outline, Section
 
+# 章节写作提示词的静态前导：人设和写作要求对所有章节相同。
+# 放在提示词最前面并以分隔符结尾，动态内容严格排在尾部，
+# 这样服务端的提示词缓存能在所有写作调用间复用公共前缀
+_SECTION_WRITING_PREAMBLE = """
+你是一个专业的研究报告写作者。请基于提供的证据写作指定章节。
+
+写作要求:
+1. 内容要准确、客观、有逻辑性
+2. 必须基于提供的证据进行写作
+3. 每个重要观点都要有相应的引用，格式为 [证据ID]
+4. 语言要专业、清晰、易懂
+5. 确保内容的连贯性和完整性
+6. 字数控制在合理范围内
+
+请输出章节内容。""" + PROMPT_PREFIX_DELIMITER
+
+# 多格式引用的合并正则：一次扫描同时识别证据ID、作者-年份和数字编号
+# 三种常见格式，按命名组区分命中的是哪一种
+_MULTI_CITE_RE = re.compile(
+    r'\[(?P<ev>evidence_[A-Za-z0-9_]+)\]'          # [evidence_xxx]
+    r'|\((?P<ay>[A-Z][a-zA-Z]+(?: et al\.?)?,? \d{4})\)'  # (Author et al., 2024)
+    r'|\[(?P<num>\d{1,3}(?:,\s*\d{1,3})*)\]'       # [1] / [1, 2, 3]
+)
+
+# 专有名词：首字母大写的连续词组，作为混合检索的关键词一路
+_PROPER_NOUN_RE = re.compile(r'[A-Z][a-zA-Z]+(?:\s+[A-Z][a-zA-Z]+)*')
+
+def _build_hs_db():
+    """编译引用模式的Hyperscan数据库（hyperscan未安装时返回None）
+
+    三个表达式都以字面定界符结尾，每处引用只报告一次命中，
+    回调里按起止偏移切片即可还原原文。
+    """
+    if hyperscan is None:
+        return None
+    try:
+        db = hyperscan.Database()
+        db.compile(
+            expressions=[
+                rb'\[evidence_[A-Za-z0-9_]+\]',
+                rb'\([A-Z][a-zA-Z]+( et al\.?)?,? [0-9]{4}\)',
+                rb'\[[0-9]{1,3}(,[ ]*[0-9]{1,3})*\]',
+            ],
+            ids=[0, 1, 2],
+            flags=[hyperscan.HS_FLAG_SOM_LEFTMOST] * 3,
+        )
+        return db
+    except Exception:  # pragma: no cover - 编译失败则退回纯Python路径
+        return None
+
+_HS_DB = _build_hs_db()
+
+def _extract_citations_hs(content: str) -> List[str]:
+    """Hyperscan路径的引用提取（语义与_MULTI_CITE_RE一致）"""
+    data = content.encode('utf-8')
+    hits: List[tuple] = []
+
+    def on_match(pat_id: int, start: int, end: int, flags: int, ctx=None):
+        hits.append((start, end))
+
+    _HS_DB.scan(data, match_event_handler=on_match)
+    hits.sort()
+    # 去掉两侧定界符（[...] 或 (...)），还原与正则捕获组相同的内容
+    return [data[start + 1:end - 1].decode('utf-8') for start, end in hits]
+# 单遍清理：空行序列归一为段落分隔，其余空白串归一为单个空格。
+# 原先的两遍sub在第一遍就吃掉了所有换行，段落结构会丢失
+_CLEAN_RE = re.compile(r'(\n\s*\n)|\s+')
+
+def _clean_sub(match: 're.Match') -> str:
+    """_CLEAN_RE 的替换回调：段落分隔保留双换行"""
+    return '\n\n' if match.group(1) else ' '
+
+# 混排文本的分词单元：单个CJK字符算一个词，其余按空白分隔的连续串算一个词。
+# 纯.split()会把整段中文数成一个"词"，导致max_section_length对中文内容失效
+_WORD_RE = re.compile(
+    r'[一-鿿぀-ヿ가-힯]'   # 汉字/假名/谚文，逐字计数
+    r'|[^\s一-鿿぀-ヿ가-힯]+'  # 其余非空白连续串
+)
+
+def _count_words(text: str) -> int:
+    """统计词数（CJK感知，单次扫描不落地列表）"""
+    return sum(1 for _ in _WORD_RE.finditer(text))
+
+def _iso_from_ns(ns: int) -> str:
+    """纳秒时间戳转ISO字符串（仅在序列化时调用）"""
+    return datetime.fromtimestamp(ns / 1e9).isoformat()
+
+def _ns_from_serialized(value: Any) -> int:
+    """反序列化时间戳：兼容ISO字符串的旧导出和纳秒整数"""
+    if isinstance(value, str):
+        return int(datetime.fromisoformat(value).timestamp() * 1e9)
+    if value is None:
+        return time.time_ns()
+    return int(value)
+
+def _dump_json(obj: Any) -> bytes:
+    """序列化为JSON字节串，优先使用orjson
+
+    orjson原生序列化datetime，不需要先isoformat成字符串；
+    标准库回退路径通过default回调做同样的转换。
+    """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(
+        obj, ensure_ascii=False, separators=(',', ':'),
+        default=lambda o: o.isoformat()
+    ).encode('utf-8')
+
 @dataclass
 class WrittenSection:
     """已写作章节"""
@@ -22,11 +147,12 @@ class WrittenSection:
     content: str
     citations: List[str] = field(default_factory=list)
     word_count: int = 0
-    created_at: datetime = field(default_factory=datetime.now)
+    # 纳秒级整数时间戳：与Evidence.timestamp一致，序列化时才格式化
+    created_at: int = field(default_factory=time.time_ns)
     quality_score: float = 0.0
-    
+
     def __post_init__(self):
-        self.word_count = len(self.content.split())
+        self.word_count = _count_words(self.content)
     
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典格式"""
@@ -36,10 +162,22 @@ class WrittenSection:
             "content": self.content,
             "citations": self.citations,
             "word_count": self.word_count,
-            "created_at": self.created_at.isoformat(),
+            "created_at": _iso_from_ns(self.created_at),
             "quality_score": self.quality_score
         }
-    
+
+    def to_json(self) -> bytes:
+        """序列化为JSON字节串（序列化路径专用，to_dict留给API调用方）"""
+        return _dump_json({
+            "section_id": self.section_id,
+            "title": self.title,
+            "content": self.content,
+            "citations": self.citations,
+            "word_count": self.word_count,
+            "created_at": _iso_from_ns(self.created_at),
+            "quality_score": self.quality_score
+        })
+
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'WrittenSection':
         """从字典创建实例"""
@@ -49,7 +187,7 @@ class WrittenSection:
             content=data["content"],
             citations=data.get("citations", []),
             word_count=data.get("word_count", 0),
-            created_at=datetime.fromisoformat(data.get("created_at", datetime.now().isoformat())),
+            created_at=_ns_from_serialized(data.get("created_at")),
             quality_score=data.get("quality_score", 0.0)
         )
 
@@ -61,25 +199,31 @@ class Report:
     sections: List[WrittenSection] = field(default_factory=list)
     total_word_count: int = 0
     total_citations: int = 0
-    created_at: datetime = field(default_factory=datetime.now)
+    # 纳秒级整数时间戳：与Evidence.timestamp一致，序列化时才格式化
+    created_at: int = field(default_factory=time.time_ns)
     quality_score: float = 0.0
-    
+    # 质量分数的滚动累加值：逐章添加时O(1)维护均值，不再全量重算
+    _score_sum: float = field(default=0.0, init=False, repr=False)
+
     def add_section(self, section: WrittenSection):
         """添加章节"""
         self.sections.append(section)
         self.total_word_count += section.word_count
         self.total_citations += len(section.citations)
-        self._update_quality_score()
-    
-    def _update_quality_score(self):
-        """更新质量分数"""
-        if not self.sections:
+        self._score_sum += section.quality_score
+        self.quality_score = self._score_sum / len(self.sections)
+
+    def iter_sections(self):
+        """惰性遍历所有章节（与Outline.iter_sections对称的接口）"""
+        return iter(self.sections)
+
+    def _resync_quality_score(self):
+        """从章节列表重算质量分数（绕过add_section批量填充后调用）"""
+        self._score_sum = sum(section.quality_score for section in self.sections)
+        if self.sections:
+            self.quality_score = self._score_sum / len(self.sections)
+        else:
             self.quality_score = 0.0
-            return
-        
-        # 计算平均质量分数
-        total_score = sum(section.quality_score for section in self.sections)
-        self.quality_score = total_score / len(self.sections)
     
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典格式"""
@@ -89,10 +233,33 @@ class Report:
             "sections": [section.to_dict() for section in self.sections],
             "total_word_count": self.total_word_count,
             "total_citations": self.total_citations,
-            "created_at": self.created_at.isoformat(),
+            "created_at": _iso_from_ns(self.created_at),
             "quality_score": self.quality_score
         }
-    
+
+    def to_json(self) -> bytes:
+        """序列化为JSON字节串（序列化路径专用，to_dict留给API调用方）"""
+        return _dump_json({
+            "title": self.title,
+            "content": self.content,
+            "sections": [
+                {
+                    "section_id": s.section_id,
+                    "title": s.title,
+                    "content": s.content,
+                    "citations": s.citations,
+                    "word_count": s.word_count,
+                    "created_at": _iso_from_ns(s.created_at),
+                    "quality_score": s.quality_score
+                }
+                for s in self.sections
+            ],
+            "total_word_count": self.total_word_count,
+            "total_citations": self.total_citations,
+            "created_at": _iso_from_ns(self.created_at),
+            "quality_score": self.quality_score
+        })
+
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Report':
         """从字典创建实例"""
@@ -101,7 +268,7 @@ class Report:
             content=data["content"],
             total_word_count=data.get("total_word_count", 0),
             total_citations=data.get("total_citations", 0),
-            created_at=datetime.fromisoformat(data.get("created_at", datetime.now().isoformat())),
+            created_at=_ns_from_serialized(data.get("created_at")),
             quality_score=data.get("quality_score", 0.0)
         )
         
@@ -109,7 +276,8 @@ class Report:
         for section_data in data.get("sections", []):
             section = WrittenSection.from_dict(section_data)
             report.sections.append(section)
-        
+
+        report._resync_quality_score()
         return report
 
 class WriterAgent(BaseAgent):
@@ -123,37 +291,81 @@ class WriterAgent(BaseAgent):
         self.max_section_length = config.get("max_section_length", 2000)
         self.citation_validation = config.get("citation_validation", True)
         self.quality_check = config.get("quality_check", True)
+        # 检索结果LRU缓存：相邻章节常产生相同查询，命中即省一次全量检索
+        self._retrieval_cache: OrderedDict = OrderedDict()
+        self._retrieval_cache_size = config.get("retrieval_cache_size", 256)
     
     def write_report(self, outline: Outline) -> Report:
-        """基于大纲写作完整报告"""
+        """基于大纲写作完整报告（同步入口）"""
+        return asyncio.run(self.write_report_async(outline))
+
+    async def write_report_async(self, outline: Outline) -> Report:
+        """并发写作完整报告
+
+        各章节的写作互相独立且受LLM往返延迟支配：先不限并发地
+        整批预取证据（检索是本地记忆库调用，开销小），再把全部
+        章节提示词交给_call_llm_many批量派发（并发数由config的
+        llm_concurrency限制，默认16），结果按章节原始顺序装配进报告。
+        """
         self.logger.info(f"Starting to write report based on outline: {outline.title}")
-        
+
         # 创建报告
-        report = Report(title=outline.title)
+        report = Report(title=outline.title, content="")
         self.current_report = report
-        
-        # 按顺序写作所有章节
-        all_sections = outline.get_all_sections()
-        for section in all_sections:
-            if not section.is_complete:
-                written_section = self.write_section(section)
-                if written_section:
-                    report.add_section(written_section)
-        
+
+        # 证据库可能在两次写作之间变化，按报告粒度清空检索缓存
+        self._retrieval_cache.clear()
+
+        pending = [section for section in outline.iter_sections() if not section.is_complete]
+
+        # 先并发预取所有章节的证据：检索受记忆库往返延迟支配，
+        # 整批重叠后检索阶段的耗时约等于最慢的一次而非各次之和
+        evidences = await asyncio.gather(
+            *(asyncio.to_thread(self.retrieve_evidence_for_section, section)
+              for section in pending)
+        )
+
+        # 整批构建提示词后一次性批量调用LLM：
+        # 并发数由_call_llm_many按llm_concurrency限制，
+        # 服务端连续批处理（vLLM等）也能吃到整批请求
+        prompts = []
+        for section, evidence in zip(pending, evidences):
+            if not evidence:
+                self.logger.warning(f"No evidence found for section: {section.title}")
+            prompts.append(self._get_section_writing_prompt(section, evidence))
+
+        responses = await self._call_llm_many(prompts)
+
+        for section, evidence, response in zip(pending, evidences, responses):
+            content = self._postprocess_response(response)
+            if not content:
+                self.logger.error("Failed to generate content for section: %s", section.title)
+                continue
+            written_section = self._finalize_section(section, content, evidence,
+                                                     outline=outline)
+            report.add_section(written_section)
+
         # 生成完整内容
         report.content = self._generate_full_content(report.sections)
-        
+
         self.logger.info(f"Completed report with {len(report.sections)} sections, {report.total_word_count} words")
-        
+
         return report
-    
-    def write_section(self, section: Section) -> Optional[WrittenSection]:
-        """写作单个章节"""
+
+    async def write_section_async(self, section: Section,
+                                  evidence: Optional[List[Evidence]] = None) -> Optional[WrittenSection]:
+        """异步写作单个章节（LLM调用转入线程，不阻塞事件循环）"""
+        return await asyncio.to_thread(self.write_section, section, evidence)
+
+    def write_section(self, section: Section,
+                      evidence: Optional[List[Evidence]] = None) -> Optional[WrittenSection]:
+        """写作单个章节（evidence为None时自行检索，预取路径直接传入）"""
         self.logger.info(f"Writing section: {section.title}")
-        
-        # 检索相关证据
-        evidence = self.retrieve_evidence_for_section(section)
-        
+
+        # 检索相关证据（预取过的章节跳过这一步）
+        if evidence is None:
+            evidence = self.retrieve_evidence_for_section(section)
+
         if not evidence:
             self.logger.warning(f"No evidence found for section: {section.title}")
             # 即使没有证据也尝试写作
@@ -165,14 +377,26 @@ class WriterAgent(BaseAgent):
         if not content:
             self.logger.error(f"Failed to generate content for section: {section.title}")
             return None
-        
-        # 提取引用
-        citations = self._extract_citations(content)
-        
+
+        return self._finalize_section(section, content, evidence)
+
+    def _finalize_section(self, section: Section, content: str,
+                          evidence: List[Evidence],
+                          outline: Optional[Outline] = None) -> WrittenSection:
+        """内容生成后的收尾：引用提取/验证、质量评估、状态更新"""
+        # 提取引用：只有验证或质量检查会用到时才做正则扫描
+        if self.citation_validation or self.quality_check:
+            citations = self._extract_citations(content)
+        else:
+            citations = []
+
+        # 证据ID集合只建一次，验证和质量评估共用
+        evidence_ids = {ev.id for ev in evidence}
+
         # 验证引用
         if self.citation_validation:
-            citations = self._validate_citations(citations, evidence)
-        
+            citations = self._validate_citations(citations, evidence_ids)
+
         # 创建已写作章节
         written_section = WrittenSection(
             section_id=section.id,
@@ -180,15 +404,22 @@ class WriterAgent(BaseAgent):
             content=content,
             citations=citations
         )
-        
+
         # 质量检查
         if self.quality_check:
-            written_section.quality_score = self._assess_section_quality(written_section, evidence)
+            written_section.quality_score = self._assess_section_quality(
+                written_section, len(evidence_ids)
+            )
         
         self.written_sections.append(written_section)
         
-        # 更新章节状态
-        section.is_complete = True
+        # 更新章节状态：有大纲时走mark_complete，让大纲的增量
+        # 完成度计数器跟着更新；直接改is_complete会绕过计数器，
+        # calculate_completeness就会基于建索引时的旧快照报0
+        if outline is not None:
+            outline.mark_complete(section.id)
+        else:
+            section.is_complete = True
         section.content = content
         section.citations = citations
         
@@ -200,16 +431,35 @@ class WriterAgent(BaseAgent):
         """为章节检索证据"""
         # 构建搜索查询
         search_query = self._build_search_query(section)
-        
+        sparse_query = self._extract_salient_terms(search_query)
+
+        # 先查LRU缓存：同一报告内重复查询直接复用
+        cache_key = (search_query, sparse_query, 10, 0.3)
+        cached = self._retrieval_cache.get(cache_key)
+        if cached is not None:
+            self._retrieval_cache.move_to_end(cache_key)
+            self.logger.debug("Retrieval cache hit for section: %s", section.title)
+            return list(cached)
+
         # 从记忆库搜索证据
         evidence = self.memory_bank.search_evidence(
             query=search_query,
             limit=10,
-            min_relevance=0.3
+            min_relevance=0.3,
+            sparse_query=sparse_query or None
         )
-        
+
+        # 按ID去重（保留首次出现）：重复证据白白消耗提示词token，
+        # 还会让引用覆盖率把同一条证据数多次
+        seen: Dict[str, Evidence] = {}
+        evidence = [seen.setdefault(ev.id, ev) for ev in evidence if ev.id not in seen]
+
+        self._retrieval_cache[cache_key] = evidence
+        if len(self._retrieval_cache) > self._retrieval_cache_size:
+            self._retrieval_cache.popitem(last=False)
+
         self.logger.info(f"Retrieved {len(evidence)} evidence items for section: {section.title}")
-        
+
         return evidence
     
     def integrate_citations(self, content: str, evidence: List[Evidence]) -> str:
@@ -228,15 +478,16 @@ class WriterAgent(BaseAgent):
         """验证内容中的引用"""
         # 提取所有引用
         citations = self._extract_citations(content)
-        
-        # 验证每个引用
-        for citation in citations:
-            evidence = self.memory_bank.get_evidence_by_citation(citation)
-            if not evidence:
-                self.logger.warning(f"Invalid citation: {citation}")
-                return False
-        
-        return True
+        if not citations:
+            return True
+
+        # 一次批量调用解析全部引用，再做集合差集
+        valid = self.memory_bank.get_evidence_by_citations(citations)
+        invalid = set(citations) - valid
+        for citation in invalid:
+            self.logger.warning("Invalid citation: %s", citation)
+
+        return not invalid
     
     def get_written_sections(self) -> List[WrittenSection]:
         """获取已写作章节"""
@@ -259,31 +510,39 @@ class WriterAgent(BaseAgent):
             query_parts.extend(section.requirements)
         
         return " ".join(query_parts)
-    
+
+    def _extract_salient_terms(self, text: str) -> str:
+        """提取显著词项作为稀疏关键词查询
+
+        自然语言拼接的查询对词频检索友好，但专有名词等稀有词
+        容易被常见词淹没；单独抽出来作为混合打分的关键词一路。
+        """
+        terms = _PROPER_NOUN_RE.findall(text)
+        # 长词通常更稀有、区分度更高
+        terms.extend(tok for tok in text.split() if len(tok) >= 8 and tok.isalpha())
+        return " ".join(dict.fromkeys(terms))
+
     def _generate_section_content(self, section: Section, evidence: List[Evidence]) -> str:
         """生成章节内容"""
         prompt = self._get_section_writing_prompt(section, evidence)
         response = self._call_llm(prompt)
-        
-        # 清理和格式化内容
+        return self._postprocess_response(response)
+
+    def _postprocess_response(self, response: str) -> str:
+        """清理LLM响应并执行长度限制"""
         content = self._clean_content(response)
-        
-        # 检查长度限制
-        if len(content.split()) > self.max_section_length:
+
+        # 检查长度限制（CJK感知计数，中文内容不再被当成一个"词"）
+        if _count_words(content) > self.max_section_length:
             content = self._truncate_content(content, self.max_section_length)
-        
+
         return content
     
     def _get_section_writing_prompt(self, section: Section, evidence: List[Evidence]) -> str:
-        """获取章节写作提示词"""
-        evidence_text = "\n\n".join([
-            f"证据 {i+1} (ID: {ev.id}):\n{ev.content[:500]}..."
-            for i, ev in enumerate(evidence)
-        ])
-        
-        return f"""
-你是一个专业的研究报告写作者。请基于提供的证据写作以下章节：
+        """获取章节写作提示词（静态前导在前，动态内容严格在尾部）"""
+        evidence_text = "\n\n".join(evidence_lines(evidence, limit=500))
 
+        return f"""{_SECTION_WRITING_PREAMBLE}
 章节信息:
 - 标题: {section.title}
 - 描述: {section.description}
@@ -291,34 +550,34 @@ class WriterAgent(BaseAgent):
 
 相关证据:
 {evidence_text}
-
-写作要求:
-1. 内容要准确、客观、有逻辑性
-2. 必须基于提供的证据进行写作
-3. 每个重要观点都要有相应的引用，格式为 [证据ID]
-4. 语言要专业、清晰、易懂
-5. 确保内容的连贯性和完整性
-6. 字数控制在合理范围内
-
-请输出章节内容。
 """
     
     def _extract_citations(self, content: str) -> List[str]:
-        """提取内容中的引用"""
-        # 查找 [evidence_xxx] 格式的引用
-        citation_pattern = r'\[evidence_[a-zA-Z0-9_]+\]'
-        citations = re.findall(citation_pattern, content)
-        
-        # 移除方括号
-        citations = [citation[1:-1] for citation in citations]
-        
+        """提取内容中的引用
+
+        单次扫描识别三种格式：[evidence_xxx]、(作者, 年份)、[数字编号]。
+        LLM偶尔会混用学术引用风格，合并成一个正则比多遍findall快，
+        也让后续验证能看到全部引用而不只是证据ID格式。
+        安装了hyperscan时走JIT化DFA，长文本批量校验时快一个量级。
+        """
+        if _HS_DB is not None:
+            return _extract_citations_hs(content)
+
+        citations = []
+        for match in _MULTI_CITE_RE.finditer(content):
+            ev_id = match.group('ev')
+            if ev_id is not None:
+                citations.append(ev_id)
+            elif match.group('ay') is not None:
+                citations.append(match.group('ay'))
+            else:
+                citations.append(match.group('num'))
         return citations
     
-    def _validate_citations(self, citations: List[str], evidence: List[Evidence]) -> List[str]:
-        """验证引用"""
+    def _validate_citations(self, citations: List[str], evidence_ids: set) -> List[str]:
+        """验证引用（调用方传入已构建的证据ID集合）"""
         valid_citations = []
-        evidence_ids = {ev.id for ev in evidence}
-        
+
         for citation in citations:
             if citation in evidence_ids:
                 valid_citations.append(citation)
@@ -327,19 +586,23 @@ class WriterAgent(BaseAgent):
         
         return valid_citations
     
-    def _assess_section_quality(self, section: WrittenSection, evidence: List[Evidence]) -> float:
-        """评估章节质量"""
+    def _assess_section_quality(self, section: WrittenSection, evidence_count: int) -> float:
+        """评估章节质量（只需要证据数量，不再重新遍历证据列表）"""
+        # 空内容直接判零分，不走后面的各项因子
+        if not section.content or not section.content.strip():
+            return 0.0
+
         quality_factors = []
-        
+
         # 内容长度合理性
         if 100 <= section.word_count <= self.max_section_length:
             quality_factors.append(1.0)
         else:
             quality_factors.append(0.5)
-        
+
         # 引用覆盖率
-        if evidence:
-            citation_coverage = len(section.citations) / len(evidence)
+        if evidence_count:
+            citation_coverage = len(section.citations) / evidence_count
             quality_factors.append(min(citation_coverage, 1.0))
         else:
             quality_factors.append(0.5)
@@ -354,48 +617,36 @@ class WriterAgent(BaseAgent):
         return sum(quality_factors) / len(quality_factors) if quality_factors else 0.0
     
     def _clean_content(self, content: str) -> str:
-        """清理内容"""
-        # 移除多余的空白字符
-        content = re.sub(r'\s+', ' ', content)
-        
-        # 移除多余的换行
-        content = re.sub(r'\n\s*\n', '\n\n', content)
-        
-        # 确保段落之间有适当的间距
-        content = content.strip()
-        
-        return content
+        """清理内容（单遍扫描，保留段落分隔）"""
+        return _CLEAN_RE.sub(_clean_sub, content).strip()
     
     def _truncate_content(self, content: str, max_words: int) -> str:
-        """截断内容到指定字数"""
-        words = content.split()
-        if len(words) <= max_words:
+        """截断内容到指定字数（CJK感知，按原文切片而非split/join重组）"""
+        count = 0
+        end = -1
+        for match in _WORD_RE.finditer(content):
+            count += 1
+            if count >= max_words:
+                end = match.end()
+                break
+        if end < 0:
             return content
-        
-        # 截断到最大字数
-        truncated_words = words[:max_words]
-        
-        # 确保句子完整性
-        truncated_content = ' '.join(truncated_words)
-        
-        # 找到最后一个句号
-        last_period = truncated_content.rfind('.')
+
+        # 确保句子完整性：带界限的rfind直接在原串上找句号，之后只切一次片
+        last_period = max(content.rfind('.', 0, end), content.rfind('。', 0, end))
         if last_period > 0:
-            truncated_content = truncated_content[:last_period + 1]
-        
-        return truncated_content
+            return content[:last_period + 1]
+
+        # 没有句号则按字数边界截断
+        return content[:end]
     
     def _generate_full_content(self, sections: List[WrittenSection]) -> str:
-        """生成完整内容"""
+        """生成完整内容（惰性生成片段，join一次成串）"""
         if not sections:
             return ""
-        
-        # 按章节顺序组织内容
-        content_parts = []
-        
-        for section in sections:
-            content_parts.append(f"## {section.title}")
-            content_parts.append(section.content)
-            content_parts.append("")  # 添加空行
-        
-        return "\n".join(content_parts)
+
+        # 按章节顺序组织内容：标题、正文、空行
+        return "\n".join(chain.from_iterable(
+            (f"## {section.title}", section.content, "")
+            for section in sections
+        ))
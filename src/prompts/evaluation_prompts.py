@@ -10,9 +10,9 @@ from ..core.planner_agent import Outline
 
 class EvaluationPrompts:
     """评估提示词模板"""
-    
-    def __init__(self):
-        self.system_prompt = """你是一个专业的研究质量评估专家，擅长从多个维度评估研究报告的质量。你的任务是：
+
+    # 系统提示词是不可变的，放在类属性上让所有实例共享同一份字符串
+    SYSTEM_PROMPT = """你是一个专业的研究质量评估专家，擅长从多个维度评估研究报告的质量。你的任务是：
 1. 客观、公正地评估研究内容的质量
 2. 从多个维度进行综合评估
 3. 提供具体的改进建议
@@ -22,7 +22,7 @@ class EvaluationPrompts:
     
     def get_report_quality_evaluation_prompt(self, report: Report, original_query: str) -> str:
         """获取报告质量评估提示词"""
-        return f"""{self.system_prompt}
+        return f"""{self.SYSTEM_PROMPT}
 
 请评估以下研究报告的质量：
 
@@ -74,7 +74,7 @@ class EvaluationPrompts:
         for i, section in enumerate(outline.sections, 1):
             sections_text.append(f"{i}. {section.title}: {section.description}")
         
-        return f"""{self.system_prompt}
+        return f"""{self.SYSTEM_PROMPT}
 
 请评估以下研究大纲的质量：
 
@@ -119,7 +119,7 @@ class EvaluationPrompts:
     
     def get_section_quality_evaluation_prompt(self, section: WrittenSection, section_requirements: List[str]) -> str:
         """获取章节质量评估提示词"""
-        return f"""{self.system_prompt}
+        return f"""{self.SYSTEM_PROMPT}
 
 请评估以下章节的质量：
 
@@ -171,7 +171,7 @@ class EvaluationPrompts:
         for i, ev in enumerate(available_evidence, 1):
             evidence_list.append(f"证据 {i} (ID: {ev.get('id', 'unknown')}): {ev.get('summary', '')[:100]}...")
         
-        return f"""{self.system_prompt}
+        return f"""{self.SYSTEM_PROMPT}
 
 请评估以下内容中引用的质量：
 
@@ -216,7 +216,7 @@ class EvaluationPrompts:
     
     def get_research_completeness_evaluation_prompt(self, outline: Outline, evidence_count: int, report: Report) -> str:
         """获取研究完整性评估提示词"""
-        return f"""{self.system_prompt}
+        return f"""{self.SYSTEM_PROMPT}
 
 请评估以下研究的完整性：
 
@@ -260,7 +260,7 @@ class EvaluationPrompts:
     
     def get_overall_research_evaluation_prompt(self, query: str, report: Report, outline: Outline, evidence_count: int) -> str:
         """获取整体研究评估提示词"""
-        return f"""{self.system_prompt}
+        return f"""{self.SYSTEM_PROMPT}
 
 请对以下研究进行整体评估：
 
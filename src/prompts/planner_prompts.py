@@ -4,24 +4,30 @@
 包含规划智能体使用的各种提示词模板。
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 from ..core.planner_agent import Outline
 from ..core.memory_bank import Evidence
 
 class PlannerPrompts:
     """规划者提示词模板"""
-    
-    def __init__(self):
-        self.system_prompt = """你是一个专业的研究规划者，擅长制定详细的研究大纲和搜索策略。你的任务是：
+
+    # 系统提示词是不可变的，放在类属性上让所有实例共享同一份字符串
+    SYSTEM_PROMPT = """你是一个专业的研究规划者，擅长制定详细的研究大纲和搜索策略。你的任务是：
 1. 根据研究查询生成结构化的研究大纲
 2. 基于新证据优化现有大纲
 3. 制定有效的搜索策略来获取相关信息
 
 请始终以专业、客观的态度进行分析，确保大纲的逻辑性和完整性。"""
-    
+
+    def __init__(self):
+        # (id(outline), outline.version) -> 已格式化的大纲文本。
+        # 同一轮迭代里大纲会被格式化进多个提示词（优化/策略/评估），
+        # 只要version没变就复用上次的结果
+        self._fmt_cache: Dict[Tuple[int, int], str] = {}
+
     def get_initial_outline_prompt(self, query: str) -> str:
         """获取初始大纲生成提示词"""
-        return f"""{self.system_prompt}
+        return f"""{self.SYSTEM_PROMPT}
 
 请根据以下研究查询生成一个详细的研究大纲：
 
@@ -66,7 +72,7 @@ class PlannerPrompts:
         for i, ev in enumerate(new_evidence, 1):
             evidence_summaries.append(f"证据 {i}:\n- 来源: {ev.source}\n- 摘要: {ev.summary}\n- 相关性: {ev.relevance_score:.2f}")
         
-        return f"""{self.system_prompt}
+        return f"""{self.SYSTEM_PROMPT}
 
 基于新获取的证据，请优化当前的研究大纲：
 
@@ -87,7 +93,7 @@ class PlannerPrompts:
     
     def get_search_strategy_prompt(self, outline: Outline) -> str:
         """获取搜索策略提示词"""
-        return f"""{self.system_prompt}
+        return f"""{self.SYSTEM_PROMPT}
 
 基于当前研究大纲，请制定详细的搜索策略：
 
@@ -127,7 +133,7 @@ class PlannerPrompts:
     
     def get_outline_quality_assessment_prompt(self, outline: Outline) -> str:
         """获取大纲质量评估提示词"""
-        return f"""{self.system_prompt}
+        return f"""{self.SYSTEM_PROMPT}
 
 请评估以下研究大纲的质量：
 
@@ -164,7 +170,7 @@ class PlannerPrompts:
         for i, ev in enumerate(evidence, 1):
             evidence_summaries.append(f"证据 {i}: {ev.summary}")
         
-        return f"""{self.system_prompt}
+        return f"""{self.SYSTEM_PROMPT}
 
 请分析当前研究大纲与已有证据之间的缺口：
 
@@ -199,33 +205,46 @@ class PlannerPrompts:
     
     def _format_outline_for_prompt(self, outline: Outline) -> str:
         """格式化大纲用于提示词"""
+        cache_key = (id(outline), outline.version)
+        cached = self._fmt_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         sections_text = []
-        
+
         for section in outline.sections:
             section_text = self._format_section_for_prompt(section, 0)
             sections_text.append(section_text)
-        
-        return f"""
+
+        formatted = f"""
 标题: {outline.title}
 描述: {outline.description}
 
 章节结构:
 {chr(10).join(sections_text)}
 """
+        if len(self._fmt_cache) >= 64:
+            self._fmt_cache.clear()
+        self._fmt_cache[cache_key] = formatted
+        return formatted
     
     def _format_section_for_prompt(self, section, indent_level: int) -> str:
         """格式化单个章节用于提示词"""
+        # 片段先收集到列表里最后一次join，避免重复拼接产生的二次方开销
+        parts: List[str] = []
+        self._append_section_parts(section, indent_level, parts)
+        return "".join(parts)
+
+    def _append_section_parts(self, section, indent_level: int, parts: List[str]):
+        """将单个章节的格式化片段追加到parts"""
         indent = "  " * indent_level
-        section_text = f"{indent}{section.id}: {section.title}\n"
-        section_text += f"{indent}  描述: {section.description}\n"
-        
+        parts.append(f"{indent}{section.id}: {section.title}\n")
+        parts.append(f"{indent}  描述: {section.description}\n")
+
         if section.requirements:
-            section_text += f"{indent}  要求: {', '.join(section.requirements)}\n"
-        
+            parts.append(f"{indent}  要求: {', '.join(section.requirements)}\n")
+
         if section.children:
-            section_text += f"{indent}  子章节:\n"
+            parts.append(f"{indent}  子章节:\n")
             for child in section.children:
-                child_text = self._format_section_for_prompt(child, indent_level + 2)
-                section_text += child_text
-        
-        return section_text
+                self._append_section_parts(child, indent_level + 2, parts)
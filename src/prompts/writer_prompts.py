@@ -5,57 +5,81 @@
 """
 
 from typing import List, Dict, Any
+from ..core.base_agent import PROMPT_PREFIX_DELIMITER
 from ..core.writer_agent import WrittenSection
 from ..core.planner_agent import Section
-from ..core.memory_bank import Evidence
+from ..core.memory_bank import Evidence, evidence_lines
+
+# 章节写作的静态指南：与系统提示词一起构成可缓存的公共前缀
+_WRITING_GUIDELINES = """写作要求:
+1. 内容要准确、客观、有逻辑性
+2. 必须基于提供的证据进行写作，不能编造信息
+3. 每个重要观点都要有相应的引用，格式为 [证据ID]
+4. 语言要专业、清晰、易懂
+5. 确保内容的连贯性和完整性
+6. 适当使用过渡词和连接词
+7. 保持学术写作的严谨性
+
+引用格式说明：
+- 在需要引用的地方使用 [证据ID] 格式
+- 例如：根据研究显示[evidence_001]，这种方法具有显著效果
+- 确保每个引用都对应提供的证据
+
+请输出章节内容，确保内容充实、逻辑清晰、引用准确。"""
 
 class WriterPrompts:
     """写作者提示词模板"""
-    
-    def __init__(self):
-        self.system_prompt = """你是一个专业的研究报告写作者，擅长基于证据进行客观、准确的写作。你的任务是：
+
+    # 系统提示词是不可变的，放在类属性上让所有实例共享同一份字符串
+    SYSTEM_PROMPT = """你是一个专业的研究报告写作者，擅长基于证据进行客观、准确的写作。你的任务是：
 1. 基于提供的证据写作高质量的研究内容
 2. 确保所有观点都有相应的证据支持
 3. 正确使用引用格式
 4. 保持内容的逻辑性和连贯性
 
 请始终以专业、客观的态度进行写作，确保内容的准确性和可信度。"""
-    
+
+    # 可缓存前导：系统提示词 + 静态写作指南，以分隔符结尾。
+    # 动态内容（章节信息、证据）严格排在分隔符之后，
+    # 使所有写作调用共享同一段服务端提示词缓存前缀
+    CACHEABLE_PREAMBLE = (
+        SYSTEM_PROMPT + "\n\n" + _WRITING_GUIDELINES + PROMPT_PREFIX_DELIMITER
+    )
+
     def get_section_writing_prompt(self, section: Section, evidence: List[Evidence]) -> str:
-        """获取章节写作提示词"""
+        """获取章节写作提示词（静态前导在前，动态内容在尾部）"""
         evidence_text = self._format_evidence_for_prompt(evidence)
-        
-        return f"""{self.system_prompt}
 
-请基于提供的证据写作以下章节：
-
-章节信息:
+        return f"""{self.CACHEABLE_PREAMBLE}章节信息:
 - 标题: {section.title}
 - 描述: {section.description}
 - 要求: {', '.join(section.requirements) if section.requirements else '无特殊要求'}
 
 相关证据:
-{evidence_text}
+{evidence_text}"""
+
+    def build_section_prompts(
+        self,
+        sections: List[Section],
+        evidence_by_section: Dict[str, List[Evidence]]
+    ) -> List[str]:
+        """批量构造章节写作提示词，供一次性提交给LLM批处理接口
+
+        所有条目共享同一份CACHEABLE_PREAMBLE常量，逐字节一致，
+        服务端前缀缓存（KV cache）在整批请求间命中；动态部分
+        （章节信息、证据）全部排在分隔符之后。
+        """
+        return [
+            self.get_section_writing_prompt(
+                section, evidence_by_section.get(section.id, [])
+            )
+            for section in sections
+        ]
 
-写作要求:
-1. 内容要准确、客观、有逻辑性
-2. 必须基于提供的证据进行写作，不能编造信息
-3. 每个重要观点都要有相应的引用，格式为 [证据ID]
-4. 语言要专业、清晰、易懂
-5. 确保内容的连贯性和完整性
-6. 适当使用过渡词和连接词
-7. 保持学术写作的严谨性
 
-引用格式说明：
-- 在需要引用的地方使用 [证据ID] 格式
-- 例如：根据研究显示[evidence_001]，这种方法具有显著效果
-- 确保每个引用都对应提供的证据
-
-请输出章节内容，确保内容充实、逻辑清晰、引用准确。"""
-    
     def get_content_revision_prompt(self, original_content: str, feedback: str) -> str:
         """获取内容修订提示词"""
-        return f"""{self.system_prompt}
+        return f"""{self.SYSTEM_PROMPT}
 
 请根据反馈意见修订以下内容：
 
@@ -76,11 +100,9 @@ class WriterPrompts:
     
     def get_citation_validation_prompt(self, content: str, evidence: List[Evidence]) -> str:
         """获取引用验证提示词"""
-        evidence_list = []
-        for i, ev in enumerate(evidence, 1):
-            evidence_list.append(f"证据 {i} (ID: {ev.id}):\n- 来源: {ev.source}\n- 内容: {ev.content[:200]}...")
-        
-        return f"""{self.system_prompt}
+        evidence_list = evidence_lines(evidence, limit=200)
+
+        return f"""{self.SYSTEM_PROMPT}
 
 请验证以下内容中的引用是否准确：
 
@@ -107,7 +129,7 @@ class WriterPrompts:
     
     def get_content_quality_assessment_prompt(self, content: str, section: Section) -> str:
         """获取内容质量评估提示词"""
-        return f"""{self.system_prompt}
+        return f"""{self.SYSTEM_PROMPT}
 
 请评估以下内容的质量：
 
@@ -146,7 +168,7 @@ class WriterPrompts:
     
     def get_summary_generation_prompt(self, content: str, max_length: int = 200) -> str:
         """获取摘要生成提示词"""
-        return f"""{self.system_prompt}
+        return f"""{self.SYSTEM_PROMPT}
 
 请为以下内容生成一个简洁的摘要：
 
@@ -164,7 +186,7 @@ class WriterPrompts:
     
     def get_transition_writing_prompt(self, previous_section: WrittenSection, current_section: Section) -> str:
         """获取过渡段落写作提示词"""
-        return f"""{self.system_prompt}
+        return f"""{self.SYSTEM_PROMPT}
 
 请为以下两个章节之间写一个过渡段落：
 
@@ -187,18 +209,19 @@ class WriterPrompts:
     
     def get_conclusion_writing_prompt(self, sections: List[WrittenSection], main_topic: str) -> str:
         """获取结论写作提示词"""
-        section_summaries = []
-        for i, section in enumerate(sections, 1):
-            section_summaries.append(f"{i}. {section.title}: {section.content[:100]}...")
-        
-        return f"""{self.system_prompt}
+        section_summaries = "\n".join(
+            f"{i}. {section.title}: {section.content[:100]}..."
+            for i, section in enumerate(sections, 1)
+        )
+
+        return f"""{self.SYSTEM_PROMPT}
 
 请为以下研究内容写一个结论段落：
 
 研究主题: {main_topic}
 
 各章节摘要:
-{chr(10).join(section_summaries)}
+{section_summaries}
 
 结论要求:
 1. 总结主要研究发现
@@ -214,22 +237,20 @@ class WriterPrompts:
         """格式化证据用于提示词"""
         if not evidence:
             return "暂无相关证据"
-        
-        evidence_text = []
-        for i, ev in enumerate(evidence, 1):
-            evidence_text.append(f"""
-证据 {i} (ID: {ev.id}):
-- 来源: {ev.source}
-- 摘要: {ev.summary}
-- 内容: {ev.content[:500]}{'...' if len(ev.content) > 500 else ''}
-- 相关性: {ev.relevance_score:.2f}
-""")
-        
-        return "\n".join(evidence_text)
+
+        # 生成器直接喂join，不先落地片段列表
+        return "\n".join(
+            f"\n证据 {i} (ID: {ev.id}):\n"
+            f"- 来源: {ev.source}\n"
+            f"- 摘要: {ev.summary}\n"
+            f"- 内容: {ev.content[:500]}{'...' if len(ev.content) > 500 else ''}\n"
+            f"- 相关性: {ev.relevance_score:.2f}\n"
+            for i, ev in enumerate(evidence, 1)
+        )
     
     def get_style_consistency_prompt(self, content: str, style_guide: Dict[str, Any]) -> str:
         """获取风格一致性检查提示词"""
-        return f"""{self.system_prompt}
+        return f"""{self.SYSTEM_PROMPT}
 
 请检查以下内容是否符合指定的写作风格：
 
@@ -250,7 +271,4 @@ class WriterPrompts:
     
     def _format_style_guide(self, style_guide: Dict[str, Any]) -> str:
         """格式化风格指南"""
-        guide_text = []
-        for key, value in style_guide.items():
-            guide_text.append(f"- {key}: {value}")
-        return "\n".join(guide_text)
+        return "\n".join(f"- {key}: {value}" for key, value in style_guide.items())
@@ -7,10 +7,45 @@
 import re
 import logging
 from typing import List, Dict, Any, Optional, Set
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 import hashlib
 
+# 模块级预编译：引用标记的提取/替换在每篇文档上都要跑
+_CITATION_RE = re.compile(r'\[citation_([a-zA-Z0-9_]+)\]')
+
+# 各格式的字段顺序和修饰模板：四个格式化器唯一的差异就在这张表里
+_STYLES = {
+    'apa': (
+        ('author', '{}'),
+        ('year', '({})'),
+        ('title', '{}'),
+        ('source', '{}'),
+        ('url', 'Retrieved from {}'),
+    ),
+    'mla': (
+        ('author', '{}'),
+        ('title', '"{}"'),
+        ('source', '{}'),
+        ('year', '{}'),
+        ('url', 'Web. {}'),
+    ),
+    'chicago': (
+        ('author', '{}'),
+        ('title', '"{}"'),
+        ('source', '{}'),
+        ('year', '{}'),
+        ('url', 'Accessed {}'),
+    ),
+    'ieee': (
+        ('author', '{}'),
+        ('title', '"{}"'),
+        ('source', '{}'),
+        ('year', '{}'),
+        ('url', '[Online]. Available: {}'),
+    ),
+}
+
 @dataclass
 class Citation:
     """引用类"""
@@ -22,15 +57,11 @@ class Citation:
     author: Optional[str] = None
     year: Optional[int] = None
     title: Optional[str] = None
-    metadata: Dict[str, Any] = None
-    created_at: datetime = None
-    
-    def __post_init__(self):
-        if self.metadata is None:
-            self.metadata = {}
-        if self.created_at is None:
-            self.created_at = datetime.now()
-    
+    # default_factory代替__post_init__里的None分支：少一次方法调用和两个判断
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    created_at: datetime = field(default_factory=datetime.now)
+
+
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典格式"""
         return {
@@ -68,14 +99,18 @@ class CitationManager:
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.logger = logging.getLogger("webweaver.citation_manager")
-        self.citations: Dict[str, Citation] = {}
+        # 追加式列表承担全部遍历（生成参考文献、导出、统计），
+        # id->下标的映射只服务按id查找；列表遍历是连续内存访问
+        self._citations: List[Citation] = []
+        self._index: Dict[str, int] = {}
         self.citation_counter = 0
         self.citation_formats = {
-            'apa': self._format_apa,
-            'mla': self._format_mla,
-            'chicago': self._format_chicago,
-            'ieee': self._format_ieee
+            style: self._make_formatter(style) for style in _STYLES
         }
+        # (citation_id, style) -> 格式化结果。格式化是纯函数，
+        # 同一引用在报告里反复出现时不重做字符串拼接；
+        # 引用集合变化（创建/导入/清空）时整体失效
+        self._fmt_cache: Dict[tuple, str] = {}
     
     def create_citation(self, text: str, source: str, url: str, **kwargs) -> Citation:
         """创建引用"""
@@ -93,57 +128,62 @@ class CitationManager:
             metadata=kwargs.get('metadata', {})
         )
         
-        self.citations[citation_id] = citation
-        self.citation_counter += 1
-        
+        self._index[citation_id] = len(self._citations)
+        self._citations.append(citation)
+        self._fmt_cache.clear()
+
         self.logger.info(f"Created citation: {citation_id}")
         return citation
     
     def get_citation(self, citation_id: str) -> Optional[Citation]:
         """获取引用"""
-        return self.citations.get(citation_id)
-    
+        i = self._index.get(citation_id)
+        return self._citations[i] if i is not None else None
+
     def get_all_citations(self) -> List[Citation]:
         """获取所有引用"""
-        return list(self.citations.values())
+        return list(self._citations)
     
     def format_citation(self, citation_id: str, format_style: str = 'apa') -> str:
         """格式化引用"""
+        cache_key = (citation_id, format_style)
+        cached = self._fmt_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         citation = self.get_citation(citation_id)
         if not citation:
             return f"[Citation not found: {citation_id}]"
-        
+
         formatter = self.citation_formats.get(format_style.lower())
         if not formatter:
             self.logger.warning(f"Unknown citation format: {format_style}")
             return f"[{citation.source}]"
-        
-        return formatter(citation)
+
+        formatted = formatter(citation)
+        self._fmt_cache[cache_key] = formatted
+        return formatted
     
     def format_citations_in_text(self, text: str, format_style: str = 'apa') -> str:
-        """格式化文本中的引用"""
-        # 查找所有引用标记
-        citation_pattern = r'\[citation_([a-zA-Z0-9_]+)\]'
-        matches = re.findall(citation_pattern, text)
-        
-        formatted_text = text
-        for citation_id in matches:
-            citation = self.get_citation(citation_id)
-            if citation:
-                formatted_citation = self.format_citation(citation_id, format_style)
-                # 替换引用标记
-                formatted_text = formatted_text.replace(
-                    f'[citation_{citation_id}]',
-                    f'({formatted_citation})'
-                )
-        
-        return formatted_text
+        """格式化文本中的引用
+
+        单遍sub回调替换：原实现先findall再逐个str.replace，
+        每个引用都要重扫整篇文本（O(N·M)）；另外捕获组去掉了
+        citation_前缀导致查找永远落空，标记从未被真正替换。
+        """
+        formatter = self.citation_formats.get(format_style.lower(), self._format_apa)
+
+        def _repl(match: 're.Match') -> str:
+            citation = self.get_citation(f"citation_{match.group(1)}")
+            if citation is None:
+                return match.group(0)
+            return f"({formatter(citation)})"
+
+        return _CITATION_RE.sub(_repl, text)
     
     def extract_citations_from_text(self, text: str) -> List[str]:
         """从文本中提取引用ID"""
-        citation_pattern = r'\[citation_([a-zA-Z0-9_]+)\]'
-        matches = re.findall(citation_pattern, text)
-        return matches
+        return _CITATION_RE.findall(text)
     
     def validate_citations_in_text(self, text: str) -> Dict[str, Any]:
         """验证文本中的引用"""
@@ -153,7 +193,7 @@ class CitationManager:
         invalid_citations = []
         
         for citation_id in extracted_citations:
-            if citation_id in self.citations:
+            if citation_id in self._index:
                 valid_citations.append(citation_id)
             else:
                 invalid_citations.append(citation_id)
@@ -166,108 +206,55 @@ class CitationManager:
         }
     
     def generate_reference_list(self, format_style: str = 'apa') -> List[str]:
-        """生成参考文献列表"""
-        references = []
-        for citation in self.citations.values():
-            formatted = self.format_citation(citation.id, format_style)
-            references.append(formatted)
-        
-        return references
+        """生成参考文献列表
+
+        格式化器解析一次后直接作用于引用对象本身，
+        不再对刚遍历到的引用按id回查一遍。
+        """
+        formatter = self.citation_formats.get(format_style.lower(), self._format_apa)
+        return [formatter(citation) for citation in self._citations]
     
     def _generate_citation_id(self) -> str:
         """生成引用ID"""
         self.citation_counter += 1
         return f"citation_{self.citation_counter:04d}"
     
+    def _format(self, citation: Citation, style: str) -> str:
+        """表驱动的通用格式化器：按风格模板拼接非空字段"""
+        parts = [
+            template.format(value)
+            for attr, template in _STYLES[style]
+            if (value := getattr(citation, attr))
+        ]
+        return ". ".join(parts) if parts else citation.source
+
+    def _make_formatter(self, style: str):
+        """为指定风格生成格式化回调"""
+        def formatter(citation: Citation) -> str:
+            return self._format(citation, style)
+        return formatter
+
     def _format_apa(self, citation: Citation) -> str:
         """APA格式引用"""
-        parts = []
-        
-        if citation.author:
-            parts.append(citation.author)
-        
-        if citation.year:
-            parts.append(f"({citation.year})")
-        
-        if citation.title:
-            parts.append(citation.title)
-        
-        if citation.source:
-            parts.append(citation.source)
-        
-        if citation.url:
-            parts.append(f"Retrieved from {citation.url}")
-        
-        return ". ".join(parts) if parts else citation.source
-    
+        return self._format(citation, 'apa')
+
     def _format_mla(self, citation: Citation) -> str:
         """MLA格式引用"""
-        parts = []
-        
-        if citation.author:
-            parts.append(citation.author)
-        
-        if citation.title:
-            parts.append(f'"{citation.title}"')
-        
-        if citation.source:
-            parts.append(citation.source)
-        
-        if citation.year:
-            parts.append(str(citation.year))
-        
-        if citation.url:
-            parts.append(f"Web. {citation.url}")
-        
-        return ". ".join(parts) if parts else citation.source
-    
+        return self._format(citation, 'mla')
+
     def _format_chicago(self, citation: Citation) -> str:
         """Chicago格式引用"""
-        parts = []
-        
-        if citation.author:
-            parts.append(citation.author)
-        
-        if citation.title:
-            parts.append(f'"{citation.title}"')
-        
-        if citation.source:
-            parts.append(citation.source)
-        
-        if citation.year:
-            parts.append(str(citation.year))
-        
-        if citation.url:
-            parts.append(f"Accessed {citation.url}")
-        
-        return ". ".join(parts) if parts else citation.source
-    
+        return self._format(citation, 'chicago')
+
     def _format_ieee(self, citation: Citation) -> str:
         """IEEE格式引用"""
-        parts = []
-        
-        if citation.author:
-            parts.append(citation.author)
-        
-        if citation.title:
-            parts.append(f'"{citation.title}"')
-        
-        if citation.source:
-            parts.append(citation.source)
-        
-        if citation.year:
-            parts.append(str(citation.year))
-        
-        if citation.url:
-            parts.append(f"[Online]. Available: {citation.url}")
-        
-        return ". ".join(parts) if parts else citation.source
+        return self._format(citation, 'ieee')
     
     def export_citations(self) -> Dict[str, Any]:
         """导出引用"""
         return {
-            "citations": {k: v.to_dict() for k, v in self.citations.items()},
-            "total_count": len(self.citations),
+            "citations": {c.id: c.to_dict() for c in self._citations},
+            "total_count": len(self._citations),
             "exported_at": datetime.now().isoformat()
         }
     
@@ -277,31 +264,39 @@ class CitationManager:
         
         for citation_id, citation_data in citations_data.items():
             citation = Citation.from_dict(citation_data)
-            self.citations[citation_id] = citation
-        
+            i = self._index.get(citation_id)
+            if i is not None:
+                self._citations[i] = citation
+            else:
+                self._index[citation_id] = len(self._citations)
+                self._citations.append(citation)
+
+        self._fmt_cache.clear()
         self.logger.info(f"Imported {len(citations_data)} citations")
     
     def clear_citations(self):
         """清空所有引用"""
-        self.citations.clear()
+        self._citations.clear()
+        self._index.clear()
         self.citation_counter = 0
+        self._fmt_cache.clear()
         self.logger.info("Cleared all citations")
     
     def get_citation_statistics(self) -> Dict[str, Any]:
         """获取引用统计信息"""
-        if not self.citations:
+        if not self._citations:
             return {
                 "total_citations": 0,
                 "sources": 0,
                 "years": [],
                 "authors": []
             }
-        
+
         sources = set()
         years = set()
         authors = set()
-        
-        for citation in self.citations.values():
+
+        for citation in self._citations:
             if citation.source:
                 sources.add(citation.source)
             if citation.year:
@@ -310,7 +305,7 @@ class CitationManager:
                 authors.add(citation.author)
         
         return {
-            "total_citations": len(self.citations),
+            "total_citations": len(self._citations),
             "sources": len(sources),
             "years": sorted(list(years)),
             "authors": sorted(list(authors))
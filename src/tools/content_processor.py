@@ -6,10 +6,80 @@
 
 import re
 import logging
+import time
 from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 import hashlib
 from collections import Counter
+from functools import lru_cache
+from itertools import islice
+
+try:
+    # 可选依赖：Hyperscan把多个引用模式编译进一个JIT化DFA，
+    # 长报告上单遍扫描代替四次回溯引擎遍历
+    import hyperscan
+except ImportError:  # pragma: no cover - 可选加速依赖
+    hyperscan = None
+
+try:
+    # 可选依赖：BLAKE3内部用SIMD，长文档哈希比MD5快数倍
+    from blake3 import blake3
+except ImportError:  # pragma: no cover - 可选加速依赖
+    blake3 = None
+
+# 模块级预编译：清理/统计/引用提取的热路径正则
+_HTML_RE = re.compile(r'<[^>]+>')
+_SENT_RE = re.compile(r'[.!?]+')
+_NONWS_RE = re.compile(r'\S+')
+# translate表把各类空白统一成空格（C级单遍），之后只需折叠连续空格
+_WS_TABLE = str.maketrans({c: ' ' for c in '\t\n\r\x0b\x0c\xa0'})
+_MULTISPACE_RE = re.compile(r'  +')
+_CJK_RE = re.compile(r'[一-鿿]')
+# 语言检测只抽样开头若干词，按词整体匹配而非全文子串扫描
+_EN_HINTS = frozenset({'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'})
+_CITATION_PATTERNS = (
+    re.compile(r'\[evidence_[a-zA-Z0-9_]+\]'),  # [evidence_xxx]
+    re.compile(r'\[[0-9]+\]'),  # [1], [2], etc.
+    re.compile(r'\([A-Za-z]+ et al\. \d{4}\)'),  # (Author et al. 2024)
+    re.compile(r'\([A-Za-z]+, \d{4}\)'),  # (Author, 2024)
+)
+
+# 停用词列表（简化版）：模块级frozenset，所有实例共享一份
+STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by',
+    'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had', 'do', 'does', 'did',
+    'will', 'would', 'could', 'should', 'may', 'might', 'must', 'can', 'this', 'that',
+    'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her',
+    'us', 'them', 'my', 'your', 'his', 'her', 'its', 'our', 'their', 'mine', 'yours',
+    'hers', 'ours', 'theirs'
+})
+
+def _build_hs_db():
+    """把全部引用模式编译为单个Hyperscan数据库（未安装时返回None）"""
+    if hyperscan is None:
+        return None
+    try:
+        db = hyperscan.Database()
+        db.compile(
+            expressions=[
+                rb'\[evidence_[a-zA-Z0-9_]+\]',
+                rb'\[[0-9]+\]',
+                rb'\([A-Za-z]+ et al\. [0-9]{4}\)',
+                rb'\([A-Za-z]+, [0-9]{4}\)',
+            ],
+            ids=[0, 1, 2, 3],
+            flags=[hyperscan.HS_FLAG_SOM_LEFTMOST] * 4,
+        )
+        return db
+    except Exception:  # pragma: no cover - 编译失败则退回纯Python路径
+        return None
+
+_HS_DB = _build_hs_db()
+
+@lru_cache(maxsize=4096)
+def _token_set(text: str) -> frozenset:
+    """文本的小写词集（带LRU缓存，供相似度计算复用）"""
+    return frozenset(text.lower().split())
 
 @dataclass
 class ProcessedContent:
@@ -28,19 +98,12 @@ class ProcessedContent:
 class ContentProcessor:
     """内容处理器"""
     
+    # 兼容旧引用：指向模块级常量，不再按实例重建
+    stop_words = STOP_WORDS
+
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.logger = logging.getLogger("webweaver.content_processor")
-        
-        # 停用词列表（简化版）
-        self.stop_words = {
-            'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by',
-            'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had', 'do', 'does', 'did',
-            'will', 'would', 'could', 'should', 'may', 'might', 'must', 'can', 'this', 'that',
-            'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her',
-            'us', 'them', 'my', 'your', 'his', 'her', 'its', 'our', 'their', 'mine', 'yours',
-            'hers', 'ours', 'theirs'
-        }
     
     def process(self, text: str) -> ProcessedContent:
         """处理文本内容"""
@@ -58,14 +121,9 @@ class ContentProcessor:
                 metadata={}
             )
         
-        # 清理文本
-        cleaned_text = self._clean_text(text)
-        
-        # 分析文本
-        word_count = self._count_words(cleaned_text)
-        sentence_count = self._count_sentences(cleaned_text)
-        paragraph_count = self._count_paragraphs(cleaned_text)
-        
+        # 清理+统计：单次扫描同时产出清理文本和三项计数
+        cleaned_text, word_count, sentence_count, paragraph_count = self._scan(text)
+
         # 提取关键词
         keywords = self._extract_keywords(cleaned_text)
         
@@ -94,20 +152,86 @@ class ContentProcessor:
             metadata=metadata
         )
     
+    def _scan(self, text: str) -> Tuple[str, int, int, int]:
+        """单遍扫描：同时完成清理和词/句/段落计数
+
+        原实现对清理后的文本做至少四次独立遍历（三次正则加一次
+        split），长文档上纯属内存带宽浪费。这里一个字符级状态机
+        顺带数出全部指标；与旧清理不同的是空行序列保留为段落分隔
+        （旧的\\s+折叠会抹掉所有换行，段落数恒为1）。
+
+        刻意保持纯Python：对UTF-8字节做JIT编译的计数核会把多字节
+        字符（中文每字3字节）的词长与字符数算错，且本函数还要产出
+        清理后的字符串，字节核无法覆盖。
+        """
+        out: List[str] = []
+        append = out.append
+        words = sentences = para_breaks = 0
+        in_tag = False       # 处于HTML标签内
+        in_word = False      # 处于一个词的中间
+        ws_run = False       # 有待折叠的空白序列
+        nl_count = 0         # 当前空白序列中的换行数
+        sent_content = False # 上个句末符之后出现过实际内容
+
+        for ch in text:
+            if in_tag:
+                if ch == '>':
+                    in_tag = False
+                continue
+            if ch == '<':
+                in_tag = True
+                continue
+            if ch.isspace():
+                ws_run = True
+                in_word = False
+                if ch == '\n':
+                    nl_count += 1
+                continue
+
+            if ws_run:
+                # 首部空白直接丢弃（等价于strip左侧）
+                if out:
+                    if nl_count >= 2:
+                        append('\n\n')
+                        para_breaks += 1
+                    else:
+                        append(' ')
+                ws_run = False
+                nl_count = 0
+
+            if not in_word:
+                words += 1
+                in_word = True
+
+            if ch in '.!?':
+                if sent_content:
+                    sentences += 1
+                    sent_content = False
+            else:
+                sent_content = True
+
+            append(ch)
+
+        if sent_content:
+            sentences += 1
+
+        cleaned = ''.join(out)
+        paragraphs = (para_breaks + 1) if cleaned else 0
+        return cleaned, words, sentences, paragraphs
+
     def _clean_text(self, text: str) -> str:
         """清理文本"""
         # 移除HTML标签
-        text = re.sub(r'<[^>]+>', '', text)
-        
-        # 移除多余的空白字符
-        text = re.sub(r'\s+', ' ', text)
-        
-        # 移除多余的换行
-        text = re.sub(r'\n\s*\n', '\n\n', text)
-        
+        text = _HTML_RE.sub('', text)
+
+        # 空白统一成空格后折叠连续空格：translate走C循环，
+        # 正则只处理剩下的双空格以上序列，单空格不再进引擎
+        text = text.translate(_WS_TABLE)
+        text = _MULTISPACE_RE.sub(' ', text)
+
         # 移除首尾空白
         text = text.strip()
-        
+
         return text
     
     def _count_words(self, text: str) -> int:
@@ -118,7 +242,7 @@ class ContentProcessor:
     def _count_sentences(self, text: str) -> int:
         """计算句子数"""
         # 简单的句子分割
-        sentences = re.split(r'[.!?]+', text)
+        sentences = _SENT_RE.split(text)
         sentences = [s.strip() for s in sentences if s.strip()]
         return len(sentences)
     
@@ -130,18 +254,14 @@ class ContentProcessor:
     
     def _extract_keywords(self, text: str, max_keywords: int = 10) -> List[str]:
         """提取关键词"""
-        # 转换为小写并分割
-        words = text.lower().split()
-        
-        # 移除停用词和短词
-        filtered_words = [
-            word for word in words 
-            if len(word) > 2 and word not in self.stop_words
-        ]
-        
-        # 计算词频
-        word_counts = Counter(filtered_words)
-        
+        # 生成器直接喂Counter：不落地过滤后的完整词表，
+        # 停用词表绑定到局部变量，内层循环少一次属性查找
+        sw = STOP_WORDS
+        word_counts = Counter(
+            word for word in text.lower().split()
+            if len(word) > 2 and word not in sw
+        )
+
         # 返回最频繁的词
         return [word for word, count in word_counts.most_common(max_keywords)]
     
@@ -151,9 +271,9 @@ class ContentProcessor:
             return text
         
         # 按句子分割
-        sentences = re.split(r'[.!?]+', text)
+        sentences = _SENT_RE.split(text)
         sentences = [s.strip() for s in sentences if s.strip()]
-        
+
         if not sentences:
             return text[:max_length] + "..."
         
@@ -168,32 +288,37 @@ class ContentProcessor:
         return summary.strip()
     
     def _detect_language(self, text: str) -> str:
-        """检测语言（简化版）"""
-        # 简单的语言检测，基于常见词汇
-        english_words = {'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'}
-        chinese_chars = re.findall(r'[\u4e00-\u9fff]', text)
-        
-        if chinese_chars:
+        """检测语言（简化版）
+
+        CJK判定用search短路于首个汉字；英文判定只抽样开头32个词
+        与提示词集比对，不再对全文做lower()加逐词子串扫描。
+        """
+        if _CJK_RE.search(text):
             return 'zh'
-        elif any(word in text.lower() for word in english_words):
-            return 'en'
-        else:
-            return 'unknown'
+        for word in islice(text.split(), 32):
+            if word.lower() in _EN_HINTS:
+                return 'en'
+        return 'unknown'
     
     def _calculate_readability(self, text: str) -> float:
         """计算可读性分数（简化版Flesch Reading Ease）"""
-        words = text.split()
-        sentences = re.split(r'[.!?]+', text)
-        sentences = [s.strip() for s in sentences if s.strip()]
-        
-        if not words or not sentences:
+        # 单遍finditer同时累计词数和字符总量，不物化词表
+        word_count = 0
+        char_total = 0
+        for m in _NONWS_RE.finditer(text):
+            word_count += 1
+            char_total += m.end() - m.start()
+
+        sentence_count = sum(1 for s in _SENT_RE.split(text) if s.strip())
+
+        if not word_count or not sentence_count:
             return 0.0
-        
+
         # 计算平均句子长度
-        avg_sentence_length = len(words) / len(sentences)
-        
+        avg_sentence_length = word_count / sentence_count
+
         # 计算平均词长度
-        avg_word_length = sum(len(word) for word in words) / len(words)
+        avg_word_length = char_total / word_count
         
         # 简化的可读性公式
         readability = 206.835 - (1.015 * avg_sentence_length) - (84.6 * avg_word_length / 100)
@@ -202,35 +327,44 @@ class ContentProcessor:
     
     def _generate_metadata(self, original_text: str, cleaned_text: str) -> Dict[str, Any]:
         """生成元数据"""
+        # 只编码一次，哈希直接消费这份字节缓冲
+        data = cleaned_text.encode('utf-8')
+        if blake3 is not None:
+            content_hash = blake3(data).hexdigest()
+        else:
+            content_hash = hashlib.md5(data).hexdigest()
         return {
             'original_length': len(original_text),
             'cleaned_length': len(cleaned_text),
             'compression_ratio': len(cleaned_text) / len(original_text) if original_text else 0,
-            'content_hash': hashlib.md5(cleaned_text.encode()).hexdigest(),
+            'content_hash': content_hash,
             'processing_timestamp': self._get_timestamp()
         }
     
     def _get_timestamp(self) -> str:
         """获取时间戳"""
-        import time
         return time.strftime('%Y-%m-%d %H:%M:%S')
     
     def extract_citations(self, text: str) -> List[str]:
         """提取引用"""
-        # 查找各种引用格式
-        citation_patterns = [
-            r'\[evidence_[a-zA-Z0-9_]+\]',  # [evidence_xxx]
-            r'\[[0-9]+\]',  # [1], [2], etc.
-            r'\([A-Za-z]+ et al\. \d{4}\)',  # (Author et al. 2024)
-            r'\([A-Za-z]+, \d{4}\)',  # (Author, 2024)
-        ]
-        
-        citations = []
-        for pattern in citation_patterns:
-            matches = re.findall(pattern, text)
-            citations.extend(matches)
-        
-        return list(set(citations))  # 去重
+        # 边收集边去重：直接建set，不经过完整中间列表
+        citations: set = set()
+
+        # 安装了hyperscan时单遍DFA扫描全部模式
+        if _HS_DB is not None:
+            data = text.encode('utf-8')
+
+            def on_match(pat_id: int, start: int, end: int, flags: int, ctx=None):
+                citations.add(data[start:end].decode('utf-8'))
+
+            _HS_DB.scan(data, match_event_handler=on_match)
+            return list(citations)
+
+        # 查找各种引用格式（模式已在模块加载时编译）
+        for pattern in _CITATION_PATTERNS:
+            citations.update(pattern.findall(text))
+
+        return list(citations)
     
     def validate_citations(self, text: str, available_citations: List[str]) -> Dict[str, Any]:
         """验证引用"""
@@ -253,18 +387,22 @@ class ContentProcessor:
         }
     
     def calculate_similarity(self, text1: str, text2: str) -> float:
-        """计算文本相似度"""
+        """计算文本相似度
+
+        词集通过lru_cache复用：同一文本与多个对象比较时（证据去重
+        的典型访问模式）只分词一次。并集大小由|A|+|B|-|A∩B|算出，
+        不再物化union集合。
+        """
         if not text1 or not text2:
             return 0.0
-        
-        # 简单的基于词汇重叠的相似度计算
-        words1 = set(text1.lower().split())
-        words2 = set(text2.lower().split())
-        
+
+        words1 = _token_set(text1)
+        words2 = _token_set(text2)
+
         if not words1 or not words2:
             return 0.0
-        
-        intersection = words1.intersection(words2)
-        union = words1.union(words2)
-        
-        return len(intersection) / len(union) if union else 0.0
+
+        intersection = len(words1 & words2)
+        union = len(words1) + len(words2) - intersection
+
+        return intersection / union if union else 0.0
@@ -5,14 +5,42 @@
 """
 
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import requests
 import json
 import time
 import logging
+import numpy as np
 
-@dataclass
+try:
+    # 可选依赖：orjson的C解析器比stdlib json快数倍，搜索API响应可达数百KB
+    import orjson
+except ImportError:  # pragma: no cover - 可选加速依赖
+    orjson = None
+
+# 各搜索引擎实例共享一个Session：连接池与keep-alive跨实例复用
+_SHARED_SESSION = requests.Session()
+_adapter = requests.adapters.HTTPAdapter(pool_connections=64, pool_maxsize=64)
+_SHARED_SESSION.mount('https://', _adapter)
+_SHARED_SESSION.mount('http://', _adapter)
+_SHARED_SESSION.headers.update({
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+})
+
+def _loads_response(response: requests.Response) -> Dict[str, Any]:
+    """解析JSON响应体：优先orjson，直接消费原始字节免去编码探测
+
+    orjson无状态、没有可跨请求复用的parser对象；惰性按需解析在
+    这里也收益有限——下游抽取器会立刻读取每条结果的全部字段。
+    """
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+# slots=True：结果对象成批产生，去掉每实例__dict__省约40%内存
+@dataclass(slots=True)
 class SearchResult:
     """搜索结果"""
     title: str
@@ -21,12 +49,8 @@ class SearchResult:
     content: str = ""
     source: str = ""
     relevance_score: float = 0.0
-    metadata: Dict[str, Any] = None
-    
-    def __post_init__(self):
-        if self.metadata is None:
-            self.metadata = {}
-    
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典格式"""
         return {
@@ -39,32 +63,84 @@ class SearchResult:
             "metadata": self.metadata
         }
 
+    def to_json(self) -> bytes:
+        """直接序列化为JSON字节串（优先orjson）"""
+        if orjson is not None:
+            return orjson.dumps(self.to_dict())
+        return json.dumps(self.to_dict(), ensure_ascii=False,
+                          separators=(',', ':')).encode('utf-8')
+
+# 按响应schema特化的单条结果抽取器：schema判定一次后循环内
+# 不再做跨API的链式.get回退，每条结果只查自己schema的字段名
+def _extract_google_item(item: Dict[str, Any]) -> SearchResult:
+    """Google CSE风格：链接字段叫link"""
+    return SearchResult(
+        title=item.get('title', ''),
+        url=item.get('link', '') or item.get('url', ''),
+        snippet=item.get('snippet', ''),
+        source=item.get('source', 'web'),
+        relevance_score=item.get('relevance_score', 0.0),
+        metadata=item.get('metadata', {})
+    )
+
+def _extract_generic_item(item: Dict[str, Any]) -> SearchResult:
+    """通用results数组：url/snippet或description"""
+    return SearchResult(
+        title=item.get('title', ''),
+        url=item.get('url', ''),
+        snippet=item.get('snippet', '') or item.get('description', ''),
+        source=item.get('source', 'web'),
+        relevance_score=item.get('relevance_score', 0.0),
+        metadata=item.get('metadata', {})
+    )
+
+def _extract_bing_item(item: Dict[str, Any]) -> SearchResult:
+    """Bing风格webPages.value：标题字段叫name"""
+    return SearchResult(
+        title=item.get('name', '') or item.get('title', ''),
+        url=item.get('url', ''),
+        snippet=item.get('snippet', ''),
+        source=item.get('source', 'web'),
+        relevance_score=item.get('relevance_score', 0.0),
+        metadata=item.get('metadata', {})
+    )
+
 class BaseSearchEngine(ABC):
     """基础搜索引擎抽象类"""
     
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.logger = logging.getLogger(f"webweaver.search.{self.__class__.__name__}")
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+        self.session = _SHARED_SESSION
     
     @abstractmethod
     def search(self, query: str, num_results: int = 10) -> List[SearchResult]:
         """执行搜索"""
         pass
-    
+
+    def batch_search(self, queries: List[str], num_results: int = 10) -> List[List[SearchResult]]:
+        """并发执行多个查询
+
+        规划阶段常常一次产出多条相关查询，逐条串行要付N倍的
+        TLS握手加RTT。这里用线程池并发发起，共享的Session连接池
+        让同域请求复用keep-alive连接；结果按查询顺序返回。
+        """
+        if not queries:
+            return []
+        with ThreadPoolExecutor(max_workers=min(8, len(queries))) as executor:
+            return list(executor.map(lambda q: self.search(q, num_results), queries))
+
     def _make_request(self, url: str, params: Dict[str, Any] = None, timeout: int = 10) -> Optional[Dict[str, Any]]:
         """发送HTTP请求"""
         try:
             response = self.session.get(url, params=params, timeout=timeout)
             response.raise_for_status()
-            return response.json()
+            return _loads_response(response)
         except requests.exceptions.RequestException as e:
             self.logger.error(f"Request failed: {e}")
             return None
-        except json.JSONDecodeError as e:
+        except ValueError as e:
+            # orjson.JSONDecodeError和json.JSONDecodeError都是ValueError子类
             self.logger.error(f"Failed to parse JSON response: {e}")
             return None
 
@@ -76,6 +152,9 @@ class WebSearchEngine(BaseSearchEngine):
         self.api_key = config.get('api_key', '')
         self.base_url = config.get('base_url', 'https://api.search.com/v1/search')
         self.max_results = config.get('max_results', 20)
+        # 首次成功解析后记住响应schema：同一API稳态下形状不变，
+        # 后续调用直接取容器并绑定抽取器，不再逐键探测
+        self._schema: Optional[tuple] = None
     
     def search(self, query: str, num_results: int = 10) -> List[SearchResult]:
         """执行网络搜索"""
@@ -105,28 +184,43 @@ class WebSearchEngine(BaseSearchEngine):
         # 例如使用DuckDuckGo或其他免费搜索API
         return []
     
+    def _detect_schema(self, data: Dict[str, Any]) -> tuple:
+        """逐键探测响应形状，命中后记录供后续调用复用"""
+        items = data.get('items')
+        if items:
+            self._schema = ('items', _extract_google_item)
+            return items, _extract_google_item
+        items = data.get('results')
+        if items:
+            self._schema = ('results', _extract_generic_item)
+            return items, _extract_generic_item
+        items = data.get('webPages', {}).get('value', [])
+        if items:
+            self._schema = ('webPages', _extract_bing_item)
+        return items, _extract_bing_item
+
     def _parse_search_results(self, data: Dict[str, Any], num_results: int) -> List[SearchResult]:
         """解析搜索结果"""
+        # 稳态路径：沿用上次判定的schema；容器为空再回退到完整探测
+        if self._schema is not None:
+            container, extract = self._schema
+            if container == 'webPages':
+                items = data.get('webPages', {}).get('value', [])
+            else:
+                items = data.get(container)
+            if not items:
+                items, extract = self._detect_schema(data)
+        else:
+            items, extract = self._detect_schema(data)
+
         results = []
-        
-        # 根据不同的API响应格式解析
-        items = data.get('items', []) or data.get('results', []) or data.get('webPages', {}).get('value', [])
-        
         for item in items[:num_results]:
             try:
-                result = SearchResult(
-                    title=item.get('title', ''),
-                    url=item.get('url', '') or item.get('link', ''),
-                    snippet=item.get('snippet', '') or item.get('description', ''),
-                    source=item.get('source', 'web'),
-                    relevance_score=item.get('relevance_score', 0.0),
-                    metadata=item.get('metadata', {})
-                )
-                results.append(result)
+                results.append(extract(item))
             except Exception as e:
                 self.logger.error(f"Error parsing search result: {e}")
                 continue
-        
+
         return results
 
 class AcademicSearchEngine(BaseSearchEngine):
@@ -159,7 +253,7 @@ class AcademicSearchEngine(BaseSearchEngine):
         try:
             response = self.session.get(self.base_url, params=params, headers=headers, timeout=10)
             response.raise_for_status()
-            data = response.json()
+            data = _loads_response(response)
         except Exception as e:
             self.logger.error(f"Academic search failed: {e}")
             return []
@@ -169,10 +263,19 @@ class AcademicSearchEngine(BaseSearchEngine):
     def _parse_academic_results(self, data: Dict[str, Any], num_results: int) -> List[SearchResult]:
         """解析学术搜索结果"""
         results = []
-        
-        papers = data.get('data', [])
-        
-        for paper in papers[:num_results]:
+
+        papers = data.get('data', [])[:num_results]
+        if not papers:
+            return results
+
+        # 引用数一次性收进数组算相关性，循环内不再做逐条标量除法
+        counts = np.fromiter(
+            (paper.get('citationCount', 0) for paper in papers),
+            dtype=np.float64, count=len(papers)
+        )
+        relevance_scores = counts * 0.01  # 基于引用数计算相关性
+
+        for paper, relevance in zip(papers, relevance_scores):
             try:
                 # 构建URL
                 paper_id = paper.get('paperId', '')
@@ -200,7 +303,7 @@ class AcademicSearchEngine(BaseSearchEngine):
                     snippet=snippet,
                     content=abstract,
                     source=source_info,
-                    relevance_score=paper.get('citationCount', 0) / 100.0,  # 基于引用数计算相关性
+                    relevance_score=float(relevance),
                     metadata={
                         'paperId': paper_id,
                         'authors': authors,
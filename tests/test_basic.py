@@ -144,5 +144,55 @@ def test_web_scraper():
     domain = scraper.get_domain("https://example.com/path")
     assert domain == "example.com"
 
+def test_batch_search_used_by_engine_group():
+    """测试引擎的批量搜索接口被_execute_engine_group_async实际调用"""
+    import asyncio
+    import importlib
+    import logging
+    import types
+    from tools.search_engine import MockSearchEngine
+
+    # core.webweaver内部用相对导入，需以src包形式加载
+    if 'src' not in sys.modules:
+        srcpkg = types.ModuleType('src')
+        srcpkg.__path__ = [os.path.join(os.path.dirname(__file__), '..', 'src')]
+        sys.modules['src'] = srcpkg
+    webweaver_mod = importlib.import_module('src.core.webweaver')
+
+    engine = MockSearchEngine({'mock_results': [
+        {'title': '结果', 'url': 'https://example.com/1'}
+    ]})
+    batch_calls = []
+    original_batch = engine.batch_search
+
+    def tracking_batch(queries, num_results=10):
+        batch_calls.append(list(queries))
+        return original_batch(queries, num_results)
+
+    engine.batch_search = tracking_batch
+
+    class _Stub:
+        logger = logging.getLogger('webweaver.test')
+
+        def _select_search_engine(self, search_type):
+            return engine
+
+        async def _process_strategy_results_async(self, strategy, search_results, semaphore):
+            return list(search_results)
+
+    strategies = [
+        {'keywords': ['foo'], 'search_type': 'web'},
+        {'keywords': ['bar'], 'search_type': 'web'},
+    ]
+    results = asyncio.run(
+        webweaver_mod.WebWeaver._execute_engine_group_async(
+            _Stub(), 'web', strategies, asyncio.Semaphore(2)
+        )
+    )
+
+    # 两条查询应合并成一次批量调用，而不是逐条走search
+    assert batch_calls == [['foo', 'bar']]
+    assert len(results) == 2
+
 if __name__ == "__main__":
     pytest.main([__file__])